@@ -4,26 +4,46 @@ import numpy as np
 import math
 import re
 import uuid
+import time
 import subprocess
-import base64
 from pdf2image import convert_from_path
 import json
 from pathlib import Path
 from langgraph.graph import StateGraph, END, START
-from typing import TypedDict, Annotated, List, Union
+from typing import TypedDict, Annotated, List, Union, Optional, Callable
 import operator
+import asyncio
 from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_anthropic import ChatAnthropic
 from typing_extensions import TypedDict
 from pydantic import BaseModel, Field
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Send
 from dotenv import load_dotenv
 from .prompts import PLAN_IMAGE_SYSTEM_PROMPT, PLAN_VIDEO_SYSTEM_PROMPT, EXECUTE_IMAGE_SYSTEM_PROMPT, EXECUTE_VIDEO_SYSTEM_PROMPT
+from .rendering.cache import render_cache
+from .rendering.workers import worker_pool, WorkerUnavailable
+from .rendering.render_job import RenderJob, render_with_cli
+from .rendering.scheduler import render_scheduler
+from .rendering.still import make_static
+from .rendering.preflight import preflight, PreflightError
+from .rendering.limits import render_limits, check_video_duration, RenderBudgetExceeded
+from .storage.blobs import blob_store
+from .jobs.events import event_bus
+from .jobs.checkpoints import checkpointer
+from .llm.streaming import astream_list_items
+from .llm.concurrency import ainvoke_limited
+from .llm.clients import llm_clients
+from .llm.usage import cached_system_message
 import markdown
 
 load_dotenv()
 
+# Retry-loop validation only needs to know the code renders, so it runs cheaply ("l" or "dry_run");
+# code that passes is rendered once more at the final quality. Stills are a single saved frame, where
+# the cost is startup rather than resolution, so they are validated at the final quality and never re-rendered.
+VALIDATION_QUALITY = os.environ.get("MANIM_VALIDATION_QUALITY", "l")
+FINAL_QUALITY = os.environ.get("MANIM_FINAL_QUALITY", "m")
 
 
 # ============================================================================
@@ -94,6 +114,15 @@ class ImageComponentCoded(BaseModel):
     code: str = Field(
         description="The full runnable error free Manim code to generate the image"
     )
+    media_url: Optional[str] = Field(
+        default=None,
+        description="Blob store URL of the rendered image (stored once, when the component finished)"
+    )
+    status: str = Field(
+        default="ok",
+        description="'ok', or 'failed' when no working render was produced (only the caption is shown)"
+    )
+    error: Optional[str] = Field(default=None, description="Why the component failed")
 
 class VideoComponentCoded(BaseModel):
     description: str = Field(
@@ -105,6 +134,20 @@ class VideoComponentCoded(BaseModel):
     code: str = Field(
         description="The full runnable error free Manim code to generate the video"
     )
+    media_url: Optional[str] = Field(
+        default=None,
+        description="Blob store URL of the rendered video (stored once, when the component finished)"
+    )
+    status: str = Field(
+        default="ok",
+        description="'ok', or 'failed' when no working render was produced (only the caption is shown)"
+    )
+    error: Optional[str] = Field(default=None, description="Why the component failed")
+
+class Header(BaseModel):
+    article_title: str = Field(description="The brief title for the whole article")
+    subtitle: str = Field(description="A brief subtitle for the whole article")
+    subject: str = Field(description="The 1-2 word subject area for the article")
 
 class AllComponents(BaseModel):
     components: List[Union[TextComponent, ImageComponent, VideoComponent]] = Field(
@@ -123,23 +166,38 @@ class GenerateArticle(TypedDict):
     topic: str
     context: str
     max_components: int
+    header: Header
+    timings: Annotated[dict, operator.or_]
     components: List[Union[TextComponent, VideoComponent, ImageComponent]]
     coded_components: Annotated[List[Union[TextComponent, ImageComponentCoded, VideoComponentCoded]], operator.add]
 
 class GenerateCode(TypedDict):
     coded_components: List[Union[TextComponent, ImageComponentCoded, VideoComponentCoded, ImageComponent, VideoComponent]]
+    index: int
     error: str
     attempts: int
     plan: str
     code: str
+    output_path: str
 
 # ============================================================================
 # CODE GENERATION SUB-GRAPH
 # ============================================================================
 
-def filter_node(state: GenerateCode):
+def component_kind(component) -> str:
+    if isinstance(component, TextComponent):
+        return "text"
+    if isinstance(component, (ImageComponent, ImageComponentCoded)):
+        return "image"
+    return "video"
+
+def filter_node(state: GenerateCode, config: RunnableConfig):
     """Filter code to route on"""
-    pass
+    component = state["coded_components"][0]
+    if isinstance(component, TextComponent):
+        # Text needs no code, so it is ready straight away
+        event_bus.publish(config.get("configurable", {}).get("thread_id"), "component_ready",
+                          index=state["index"], kind="text", html=component_html(component))
 
 def first_router(state: GenerateCode):
     component = state["coded_components"][0]
@@ -147,18 +205,19 @@ def first_router(state: GenerateCode):
         return END
     return "plan_node"
 
-def plan_node(state: GenerateCode):
+async def plan_node(state: GenerateCode, config: RunnableConfig):
     component = state["coded_components"][0]
     print("Type", type(component))
+    event_bus.publish(config.get("configurable", {}).get("thread_id"), "component_planning",
+                      index=state["index"], kind=component_kind(component))
     
     prompt = component.description
-    llm = ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0.5, 
-                        api_key=os.environ.get("ANTHROPIC_API_KEY"), max_tokens=4096)
+    llm = llm_clients.get(temperature=0.5, max_tokens=4096)
 
     if isinstance(component, VideoComponent):
         print("Generating Code for Video")
         messages = [
-            SystemMessage(content=PLAN_VIDEO_SYSTEM_PROMPT),
+            cached_system_message(PLAN_VIDEO_SYSTEM_PROMPT),
             HumanMessage(content=f"Create a plan to visualize this prompt: '{prompt}'. "
                                 "You are generating a video, and not a still image, clearly state that in plan. "
                                 "Be specific about objects, layout, color, and motion. This video is only meant to be "
@@ -169,7 +228,7 @@ def plan_node(state: GenerateCode):
     else:
         print("Generating Code for Image")
         messages = [
-            SystemMessage(content=PLAN_IMAGE_SYSTEM_PROMPT),
+            cached_system_message(PLAN_IMAGE_SYSTEM_PROMPT),
             HumanMessage(content=f"Create a plan to visualize this prompt: '{prompt}'. "
                                 "You are generating a still image, clearly state that in plan. Be specific about objects, "
                                 "layout, color, and motion. Make sure everything fits the screen is laid out nicely, "
@@ -178,17 +237,19 @@ def plan_node(state: GenerateCode):
                                 "Please ensure that NOTHING on the screen OVERLAPS. This is VERY important, consider the size of the components and make sure NOTHING OVERLAPS but also make sure NOTHING GOES of SCREEN and the edges don't have anything on them." )
         ]
     
-    plan = llm.invoke(messages).content
+    call_site = "plan_video" if isinstance(component, VideoComponent) else "plan_image"
+    plan = (await ainvoke_limited(llm, messages, call_site)).content
     return {"plan": plan}
 
-def execute_node(state: GenerateCode):
+async def execute_node(state: GenerateCode, config: RunnableConfig):
     plan = state["plan"]
     error = state.get("error", "")
     code = state["code"]
     component = state["coded_components"][0]
+    event_bus.publish(config.get("configurable", {}).get("thread_id"), "component_coding",
+                      index=state["index"], attempt=state.get("attempts", 0) + 1)
 
-    llm = ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0.5, 
-                        api_key=os.environ.get("ANTHROPIC_API_KEY"), max_tokens=8192)
+    llm = llm_clients.get(temperature=0.5, max_tokens=8192)
 
 
     if isinstance(component, VideoComponent):
@@ -211,66 +272,119 @@ def execute_node(state: GenerateCode):
         )
 
     messages = [
-        SystemMessage(content=system_prompt),
+        cached_system_message(system_prompt),
         HumanMessage(content=user_prompt)
     ]
 
-    code = llm.invoke(messages).content
+    call_site = "execute_video" if isinstance(component, VideoComponent) else "execute_image"
+    code = (await ainvoke_limited(llm, messages, call_site)).content
     return {"code": code, "error": ""}
 
-def run_node(state: GenerateCode):
+def validation_quality(still: bool) -> str:
+    """Quality run_node renders at: stills go straight to the final quality, so they render only once"""
+    return FINAL_QUALITY if still else VALIDATION_QUALITY
+
+def run_node(state: GenerateCode, config: RunnableConfig):
     code = state["code"]
     attempts = state.get("attempts", 0) + 1
+    request_id = config.get("configurable", {}).get("thread_id")
+    still = isinstance(state["coded_components"][0], ImageComponent)
+    quality = validation_quality(still)
 
     try:
-        match = re.search(r"from manim import \*[\s\S]*", code)
-        if not match:
-            raise Exception("Could not find 'from manim import *' in LLM output.")
-
-        cleaned_code = match.group(0)
-        cleaned_code = re.sub(r"```+.*", "", cleaned_code).strip()
-
-        match_scene = re.search(r"class\s+(\w+)\s*\((?:Scene|ThreeDScene)\)", cleaned_code)
-        scene_name = match_scene.group(1) if match_scene else "Scene"
+        output_path = render_manim_from_llm(code, request_id=request_id, quality=quality, still=still)
 
-        file_id = uuid.uuid4().hex[:8]
-        py_path = Path(f"manim_scene_{file_id}.py")
-        py_path.write_text(cleaned_code)
-        print(f"Saved to file: {py_path}")
-
-        cmd = ["manim", "-qm", "-v", "WARNING", str(py_path), scene_name]
-        print("Running:", " ".join(cmd))
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-        print(f"✔ Manim render succeeded on attempt {attempts}")
-        return {"error": "", "attempts": attempts}
+        print(f"✔ Manim validation render succeeded on attempt {attempts}")
+        result = {"error": "", "attempts": attempts, "output_path": str(output_path or "")}
 
+    except PreflightError as e:
+        print(f"❌ Pre-flight check failed on attempt {attempts}:\n{e}")
+        result = {"error": str(e), "attempts": attempts, "output_path": ""}
+    except RenderBudgetExceeded as e:
+        print(f"⏱ Render stopped on attempt {attempts}: {e.reason}")
+        result = {"error": str(e), "attempts": attempts, "output_path": ""}
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if e.stderr else e.stdout if e.stdout else str(e)
         print(f"❌ Error on attempt {attempts}:\n{error_msg}")
-        return {"error": error_msg, "attempts": attempts}
+        result = {"error": error_msg, "attempts": attempts, "output_path": ""}
     except Exception as e:
         print(f"❌ Error on attempt {attempts}: {e}")
-        return {"error": str(e), "attempts": attempts}
+        result = {"error": str(e), "attempts": attempts, "output_path": ""}
+
+    event_bus.publish(request_id, "component_render", index=state["index"], attempt=attempts,
+                      ok=not result["error"], error=result["error"] or None)
+    return result
 
 def should_retry(state: GenerateCode):
     if state["error"] and state["attempts"] < 3:
         return "execute_node"
     return "finish_node"
 
-def finish_node(state: GenerateCode):
+def finish_node(state: GenerateCode, config: RunnableConfig):
     orig_component = state["coded_components"][0]
     description = orig_component.description
     caption = orig_component.caption
     code = state["code"]
+    output_path = state.get("output_path") or None
 
-    if isinstance(orig_component, VideoComponent):
-        new_component = VideoComponentCoded(description=description, caption=caption, code=code)
-    else:  # ImageComponent
-        new_component = ImageComponentCoded(description=description, caption=caption, code=code)
-    
+    still = isinstance(orig_component, ImageComponent)
+
+    # Final-quality render runs here, after the retry loop, alongside the other components' branches
+    if not state.get("error") and validation_quality(still) != FINAL_QUALITY:
+        request_id = config.get("configurable", {}).get("thread_id")
+        try:
+            output_path = render_manim_from_llm(code, request_id=request_id, quality=FINAL_QUALITY, still=still)
+        except Exception as e:
+            print(f"❌ Final render failed, keeping validation render: {e}")
+
+    thread_id = config.get("configurable", {}).get("thread_id")
+
+    # Still broken after the last retry: keep the caption and the rest of the article
+    if state.get("error"):
+        new_component = failed_component(orig_component, state["error"], code)
+        publish_component(thread_id, state["index"], new_component)
+        return {"coded_components": [new_component]}
+
+    # Pin the render in the blob store now; output_path lives in the render cache, which may evict it
+    try:
+        media_url = store_render(output_path, code, thread_id, still=still)
+    except Exception as e:
+        new_component = failed_component(orig_component, str(e), code)
+        publish_component(thread_id, state["index"], new_component)
+        return {"coded_components": [new_component]}
+
+    coded_class = VideoComponentCoded if isinstance(orig_component, VideoComponent) else ImageComponentCoded
+    new_component = coded_class(description=description, caption=caption, code=code, media_url=media_url)
+    publish_component(thread_id, state["index"], new_component)
     return {"coded_components": [new_component]}
 
+def store_render(output_path: Optional[str], code: str, request_id: str, still: bool) -> str:
+    """Copy a render into the blob store and return its URL (rendering again if it was already evicted)"""
+    if output_path:
+        try:
+            return blob_store.store_media(output_path)
+        except FileNotFoundError:
+            pass
+    # e.g. a run resumed long after its validation render left the render cache
+    print("⚠️ Render no longer cached, rendering it again")
+    return blob_store.store_media(render_manim_from_llm(code, request_id=request_id, quality=FINAL_QUALITY, still=still))
+
+def failed_component(component, error: str, code: str = ""):
+    """Coded stand-in for a visual that could not be produced"""
+    coded_class = VideoComponentCoded if isinstance(component, (VideoComponent, VideoComponentCoded)) else ImageComponentCoded
+    print(f"⚠️ Component failed, showing its caption only: {error}")
+    return coded_class(description=component.description, caption=component.caption, code=code,
+                       status="failed", error=error)
+
+def publish_component(thread_id: str, index: int, component):
+    """Send a finished component (or its caption-only placeholder) to the job's event stream"""
+    if getattr(component, "status", "ok") == "failed":
+        event_bus.publish(thread_id, "component_failed", index=index, kind=component_kind(component),
+                          error=component.error, html=component_html(component))
+    else:
+        event_bus.publish(thread_id, "component_ready", index=index, kind=component_kind(component),
+                          html=component_html(component))
+
 # ============================================================================
 # COMPONENT GENERATION
 # ============================================================================
@@ -306,49 +420,136 @@ Your job:
 
 Output only a JSON object following the AllComponents schema.
 Do not include any extra commentary, markdown, or explanations.
+"""
 
+component_creator_request = """
 Topic: {topic}
 Maximum components: {max_components}
 Additional context: {context}
 """
 
-def create_components(state: GenerateArticle):
+async def create_components(state: GenerateArticle, config: RunnableConfig):
     """Generate all components for the article"""
     topic = state['topic']
     max_components = state['max_components']
     context = state.get('context', '')
 
-    llm = ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0.7, 
-                        api_key=os.environ.get("ANTHROPIC_API_KEY"), max_tokens=4096)
-    
-    structured_llm = llm.with_structured_output(AllComponents)
+    thread_id = config.get("configurable", {}).get("thread_id")
+    started = time.monotonic()
+
+    llm = llm_clients.get(temperature=0.7, max_tokens=4096)
     
-    system_message = component_creator_instructions.format(
-        topic=topic,
-        max_components=max_components,
-        context=context
+    # The instructions are a prompt-cache breakpoint; the per-article topic and context follow them
+    system_message = cached_system_message(
+        component_creator_instructions.format(max_components=max_components),
+        component_creator_request.format(topic=topic, max_components=max_components, context=context)
     )
     
-    components = structured_llm.invoke([
-        SystemMessage(content=system_message),
+    # Stream the plan and start coding each visual as soon as it is complete,
+    # instead of waiting for the whole AllComponents object
+    components = []
+    prefetched = config.get("configurable", {}).get("prefetched")
+    async for index, item in astream_list_items(llm, AllComponents, "components", [
+        system_message,
         HumanMessage(content="Generate the complete set of components for this topic.")
-    ])
+    ], call_site="planner"):
+        component = AllComponents.model_validate({"components": [item]}).components[0]
+        components.append(component)
+        if prefetched is not None and not isinstance(component, TextComponent):
+            prefetch_component(prefetched, thread_id, index, component)
     
-    return {"components": components.components}
+    event_bus.publish(thread_id, "plan", components=[
+        {"index": i, "kind": component_kind(c), "caption": getattr(c, "caption", None)}
+        for i, c in enumerate(components)
+    ])
+    return {"components": components, "timings": {"plan": time.monotonic() - started}}
+
+# ============================================================================
+# HEADER GENERATION
+# ============================================================================
+# The header only depends on the topic and context, so it runs as a graph branch
+# alongside create_components instead of delaying the planner by a round trip.
+
+title_creator_instructions = """
+You are an expert explainer. For the given topic and context from reference material, generate a brief title, subtitle, and subject area 
+that will be displayed at the top of the explanation. Follow the structured output.  
+
+This is the topic: {topic}
+This is the additional context: {context}
+"""
+
+async def create_header(state: GenerateArticle, config: RunnableConfig):
+    """Generate the article's title, subtitle and subject"""
+    thread_id = config.get("configurable", {}).get("thread_id")
+    started = time.monotonic()
+
+    structured_llm = llm_clients.get(temperature=0.7, max_tokens=4096, schema=Header)
+    context = state.get('context') or "No additional context provided"
+    header = await ainvoke_limited(structured_llm, [
+        SystemMessage(content=title_creator_instructions.format(topic=state['topic'], context=context)),
+        HumanMessage(content="Generate")
+    ], "header")
+
+    event_bus.publish(thread_id, "header", title=header.article_title, subtitle=header.subtitle, subject=header.subject,
+                      html=header_html(header.article_title, header.subtitle, header.subject))
+    return {"header": header, "timings": {"header": time.monotonic() - started}}
 
 def initiate_code_generation(state: GenerateArticle):
     """Map step: send each component to the code generation sub-graph"""
     return [
-        Send("create_code", {
-            "coded_components": [component], 
-            "error": "", 
-            "attempts": 0, 
-            "plan": "", 
-            "code": ""
-        }) 
-        for component in state["components"]
+        Send("create_code", code_state(index, component))
+        for index, component in enumerate(state["components"])
     ]
 
+def code_state(index: int, component) -> GenerateCode:
+    """Initial code sub-graph state for one component"""
+    return {
+        "coded_components": [component], 
+        "index": index,
+        "error": "", 
+        "attempts": 0, 
+        "plan": "", 
+        "code": "",
+        "output_path": ""
+    }
+
+# ============================================================================
+# EARLY DISPATCH
+# ============================================================================
+# Components that finish streaming out of the planner are coded right away as tasks.
+# The Send branch for the same component then just awaits that task, so the graph's
+# fan-out (and the plan-ordered coded_components it produces) is unchanged.
+# The tasks live in a dict owned by one agenerate_manim_article call (passed to the nodes
+# as config["configurable"]["prefetched"]), which cancels whatever is left when the run ends.
+
+def prefetch_component(prefetched: dict, thread_id: str, index: int, component):
+    """Start the code sub-graph for a component while the plan is still streaming"""
+    prefetched[index] = asyncio.create_task(
+        code_graph.ainvoke(code_state(index, component), {"configurable": {"thread_id": thread_id}})
+    )
+
+def take_prefetched(prefetched: Optional[dict], index: int) -> Optional[asyncio.Task]:
+    return prefetched.pop(index, None) if prefetched is not None else None
+
+def discard_prefetched(prefetched: dict):
+    """Cancel early runs that no create_code branch picked up (the run failed or was cancelled)"""
+    while prefetched:
+        _, task = prefetched.popitem()
+        task.cancel()
+
+async def create_code(state: GenerateCode, config: RunnableConfig):
+    """Code one component, reusing the run started while the plan was streaming"""
+    thread_id = config.get("configurable", {}).get("thread_id")
+    task = take_prefetched(config.get("configurable", {}).get("prefetched"), state["index"])
+    try:
+        result = await task if task else await code_graph.ainvoke(state, config)
+    except Exception as e:
+        # e.g. the LLM governor ran out of retries; the other components are unaffected
+        component = failed_component(state["coded_components"][0], str(e))
+        publish_component(thread_id, state["index"], component)
+        return {"coded_components": [component]}
+    return {"coded_components": result["coded_components"]}
+
 # ============================================================================
 # GRAPH CONSTRUCTION
 # ============================================================================
@@ -370,78 +571,80 @@ code_builder.add_conditional_edges("run_node", should_retry, {
     "finish_node": "finish_node"
 })
 code_builder.add_edge("finish_node", END)
+code_graph = code_builder.compile()
 
 # Main article generation graph
 builder = StateGraph(GenerateArticle)
+builder.add_node("create_header", create_header)
 builder.add_node("create_components", create_components)
-builder.add_node("create_code", code_builder.compile())
+builder.add_node("create_code", create_code)
 
+# The header and the plan are generated in parallel
+builder.add_edge(START, "create_header")
+builder.add_edge("create_header", END)
 builder.add_edge(START, "create_components")
 builder.add_conditional_edges("create_components", initiate_code_generation, ["create_code"])
 builder.add_edge("create_code", END)
 
 # Compile
-memory = MemorySaver()
-graph = builder.compile(checkpointer=memory)
+checkpointer.allow_types(Header, TextComponent, ImageComponent, VideoComponent, ImageComponentCoded, VideoComponentCoded)
+graph = builder.compile(checkpointer=checkpointer)
 
 # ============================================================================
 # RENDERING UTILITIES
 # ============================================================================
 
-def render_manim_from_llm(code: str):
-    """Render Manim code and return path to output file"""
+def render_manim_from_llm(code: str, request_id: str = None, quality: str = FINAL_QUALITY, still: bool = False):
+    """
+    Render Manim code and return path to output file
+
+    Args:
+        code: LLM output containing the Manim script
+        request_id: Groups renders of one article for fair scheduling
+        quality: Manim quality flag ("l", "m", "h"), or "dry_run" to only check that the scene runs
+        still: Render only the last frame as a PNG, with animations made instant
+
+    Returns:
+        Path to the rendered file, or None for dry runs
+    """
     match = re.search(r"from manim import \*[\s\S]*", code)
     if not match:
         raise Exception("Could not find 'from manim import *' in LLM output.")
     cleaned_code = re.sub(r"```+.*", "", match.group(0)).strip()
 
-    match_scene = re.search(r"class\s+(\w+)\s*\((?:Scene|ThreeDScene)\)", cleaned_code)
-    scene_name = match_scene.group(1) if match_scene else "Scene"
-
-    file_id = uuid.uuid4().hex[:8]
-    py_path = Path(f"manim_scene_{file_id}.py")
-    py_path.write_text(cleaned_code)
-    print(f"Saved to file: {py_path}")
-
-    media_root = Path("media")
-    before_files = {p.resolve() for p in media_root.rglob("*") if p.is_file()} if media_root.exists() else set()
-
-    cmd = ["manim", "-qm", "-v", "WARNING", str(py_path), scene_name]
-    print("Running:", " ".join(cmd))
-    subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-    after_files = {p.resolve() for p in media_root.rglob("*") if p.is_file()}
-    new_files = sorted(after_files - before_files)
+    # Catch syntax errors, bad imports and unknown names in milliseconds, before any Manim process
+    scene_name = preflight(cleaned_code)
 
-    if not new_files:
-        raise RuntimeError("Manim ran successfully but produced no output files.")
-
-    print("New files created:")
-    for f in new_files:
-        print("   >", f)
-
-    final_mp4 = [str(f) for f in new_files if str(f).endswith('.mp4') and 'partial_movie_files' not in str(f)]
-
-    if final_mp4 == []:
-        return new_files[0]
-    else:
-        return final_mp4[0]
-
-def encode_base64(path):
-    """Return base64-encoded data URI for images or videos"""
-    ext = Path(path).suffix.lower()
-
-    if ext in [".png", ".jpg", ".jpeg", ".gif"]:
-        mime = f"image/{ext[1:]}"
-    elif ext in [".mp4", ".mov", ".m4v"]:
-        mime = "video/mp4"
+    dry_run = quality == "dry_run"
+    if dry_run:
+        quality = "l"
+    if still:
+        cleaned_code = make_static(cleaned_code)
     else:
-        raise ValueError(f"Unsupported file type: {ext}")
+        check_video_duration(cleaned_code, scene_name, render_limits)
 
-    with open(path, "rb") as f:
-        data = base64.b64encode(f.read()).decode()
+    cache_key = render_cache.key_for(cleaned_code, scene_name, quality, still=still)
+    cached_path = render_cache.get(cache_key)
+    if cached_path:
+        # A cached render proves the code runs, so it also satisfies a dry run
+        print(f"⚡ Render cache hit for {scene_name}: {cached_path}")
+        return str(cached_path)
 
-    return f"data:{mime};base64,{data}"
+    job = RenderJob(cleaned_code, scene_name, quality, dry_run=dry_run, still=still)
+    job.write()
+    try:
+        with render_scheduler.slot(request_id):
+            try:
+                output_path = worker_pool.render(cleaned_code, str(job.py_path), scene_name, job.manim_config())
+            except WorkerUnavailable as e:
+                print(f"⚠️ Falling back to manim CLI: {e}")
+                output_path = render_with_cli(job)
+
+        if dry_run:
+            return None
+        return str(render_cache.put(cache_key, output_path))
+    finally:
+        job.cleanup()
 
 def process_text_with_formatting(text: str) -> str:
     """Convert markdown text with LaTeX to formatted HTML"""
@@ -491,9 +694,27 @@ def process_text_with_formatting(text: str) -> str:
 
 
 def generate_page(components, title, subtitle, subject, output_path="article.html"):
-    """Generate HTML page from components"""
-    html = []
-    html.append(f"""
+    """Generate HTML page from components (a coded visual without stored media is marked failed)"""
+    html = [header_html(title, subtitle, subject)]
+
+    for i, c in enumerate(components):
+        try:
+            html.append(component_html(c))
+        except Exception as e:
+            # Only visuals have a caption-only placeholder; anything else is a real bug
+            if not isinstance(c, (ImageComponentCoded, VideoComponentCoded)):
+                raise
+            components[i] = failed_component(c, str(e), getattr(c, "code", ""))
+            html.append(component_html(components[i]))
+
+    final_html = "\n".join(html)
+    Path(output_path).write_text(final_html)
+    print(f"✅ Generated HTML: {output_path}")
+    return final_html
+
+def header_html(title, subtitle, subject) -> str:
+    """HTML for the article's title block"""
+    return f"""
 <header class="flex flex-col gap-6 text-center border-b border-gray-100 pb-10">
   <nav class="flex items-center justify-center gap-2 text-xs uppercase tracking-widest text-[#6E6B65] opacity-60 font-medium">
     <a class="hover:text-[#2D2A26] transition-colors" href="#">{subject}</a>
@@ -506,94 +727,152 @@ def generate_page(components, title, subtitle, subject, output_path="article.htm
     {subtitle}
   </p>
 </header>
-    """)
+    """
 
-    for c in components:
+def component_status(components) -> List[dict]:
+    """Per-component outcome saved with the article"""
+    return [
+        {"index": i, "kind": component_kind(c), "status": getattr(c, "status", "ok"), "error": getattr(c, "error", None)}
+        for i, c in enumerate(components)
+    ]
 
-        if isinstance(c, TextComponent):
-            formatted_html = process_text_with_formatting(c.text)
-            html.append(f"""
+def placeholder_html(c) -> str:
+    """Caption-only block shown in place of a visual that failed"""
+    return f"""
+                <section class="flex flex-col gap-4 py-8 mt-8" data-component-status="failed">
+                <figure class="w-full bg-gray-50 border border-dashed border-[#EBEBE8] rounded-sm px-6 py-10 text-center">
+                    <p class="text-sm text-[#6E6B65] opacity-70 italic">This {component_kind(c)} could not be generated.</p>
+                </figure>
+                <figcaption class="text-center text-sm text-[#6E6B65] opacity-70 mt-2">
+                    {c.caption}
+                </figcaption>
+            </section>"""
+
+def stored_media(component: Union[ImageComponentCoded, VideoComponentCoded]) -> str:
+    """Return the blob store URL finish_node saved for a coded component"""
+    if not component.media_url:
+        raise RuntimeError(f"No rendered output for component: {component.caption}")
+    return component.media_url
+
+def component_html(c) -> str:
+    """HTML for one finished component (media is referenced by the URL finish_node stored, never stored again)"""
+    if getattr(c, "status", "ok") == "failed":
+        return placeholder_html(c)
+
+    if isinstance(c, TextComponent):
+        formatted_html = process_text_with_formatting(c.text)
+        return f"""
             <div class="prose prose-lg max-w-none font-serif text-[#2D2A26] leading-loose text-lg md:text-xl mt-12">
             {formatted_html}
             </div>
-            """)
+            """
 
-        elif isinstance(c, ImageComponentCoded):
-            image_path = render_manim_from_llm(c.code)
-            data_uri = encode_base64(image_path)
-            html.append(f"""
+    elif isinstance(c, ImageComponentCoded):
+        media_url = stored_media(c)
+        return f"""
                     <section class="flex flex-col gap-4 py-8 mt-8">
                     <figure class="group relative w-full aspect-video bg-gray-50 overflow-hidden shadow-lg border border-[#EBEBE8]">
-                        <img class="w-full h-full object-cover opacity-90 transition-transform duration-700 " src="{data_uri}" alt="Manim visualization" />
+                        <img class="w-full h-full object-cover opacity-90 transition-transform duration-700 " src="{media_url}" alt="Manim visualization" />
                     </figure>
                     <figcaption class="text-center text-sm text-[#6E6B65] opacity-70 mt-2">
                         {c.caption}
                     </figcaption>
-                    </section>""")
-        elif isinstance(c, VideoComponentCoded):
-            video_path = render_manim_from_llm(c.code)
-            data_uri = encode_base64(video_path)
-            html.append(f"""
+                    </section>"""
+    elif isinstance(c, VideoComponentCoded):
+        media_url = stored_media(c)
+        return f"""
                 <section class="flex flex-col gap-4 py-8 mt-8">
                 <figure class="w-full bg-gray-50 shadow-lg border border-[#EBEBE8] rounded-sm overflow-hidden">
-                    <div class="custom-video-player" data-video-src="{data_uri}"></div>
+                    <div class="custom-video-player" data-video-src="{media_url}"></div>
                 </figure>
                 <figcaption class="text-center text-sm text-[#6E6B65] opacity-70 mt-2">
                     {c.caption}
                 </figcaption>
-            </section>""")
-
-    final_html = "\n".join(html)
-    Path(output_path).write_text(final_html)
-    print(f"✅ Generated HTML: {output_path}")
-    return final_html
+            </section>"""
+    return ""
 
 # ============================================================================
 # MAIN API
 # ============================================================================
 
-def generate_manim_article(topic: str, max_components: int = 15, output_path: str = "article.html", context: str = None, anthropic_api_key: str = None):
+async def agenerate_manim_article(topic: str, max_components: int = 15, output_path: str = "article.html", context: str = None, anthropic_api_key: str = None,
+                                  thread_id: str = None, progress: Callable[[str], None] = None):
     """
     Generate an interactive article with Manim visualizations from a topic.
+    LLM calls are awaited through the LLM governor; renders run in worker threads.
     
     Args:
         topic: The topic to explain (e.g., "Explain the concept of a derivative")
         max_components: Maximum number of components to generate (default 15, AI will typically use 3-5)
         output_path: Path to save the output HTML file
         anthropic_api_key: Anthropic API key (or set ANTHROPIC_API_KEY env var)
+        thread_id: Graph thread id, e.g. the job id (a new one by default)
+        progress: Called with a short description as each stage starts
     
     Returns:
-        List containing [html_content, title, subtitle, subject]
+        List containing [html_content, title, subtitle, subject, component_status]
     """
-    class Header(BaseModel):
-        article_title: str = Field(description="The brief title for the whole article")
-        subtitle: str = Field(description="A brief subtitle for the whole article")
-        subject: str = Field(description="The 1-2 word subject area for the article")
-
     if anthropic_api_key:
         os.environ["ANTHROPIC_API_KEY"] = anthropic_api_key
     
     if not os.environ.get("ANTHROPIC_API_KEY"):
         raise ValueError("ANTHROPIC_API_KEY must be set in environment or passed as argument")
 
-    # Generate header
-    llm = ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0.7, 
-                        api_key=os.environ.get("ANTHROPIC_API_KEY"), max_tokens=4096)
-    structured_llm = llm.with_structured_output(Header)
+    report = progress or (lambda message: None)
+    started = time.monotonic()
 
-    title_creator_instructions = """
-    You are an expert explainer. For the given topic and context from reference material, generate a brief title, subtitle, and subject area 
-    that will be displayed at the top of the explanation. Follow the structured output.  
+    thread_id = thread_id or str(uuid.uuid4())
+    # Early code runs of this job only (not saved in checkpoints: non-primitive config values aren't)
+    prefetched = {}
+    thread = {"configurable": {"thread_id": thread_id, "prefetched": prefetched}}
 
-    This is the topic: {topic}
-    This is the additional context: {context}
-    """
+    list_of_comps = []
+    header = None
+    timings = {}
+    planned = finished = 0
+    graph_input = {"topic": topic, "max_components": max_components, "context": context}
+
+    # A thread with saved checkpoints was interrupted (e.g. the server crashed mid-job):
+    # resume it, so components whose results were checkpointed are not generated again
+    snapshot = await graph.aget_state(thread)
+    if snapshot.values:
+        graph_input = None
+        header = snapshot.values.get("header")
+        timings = snapshot.values.get("timings") or {}
+        list_of_comps = list(snapshot.values.get("coded_components") or [])
+        planned = len(snapshot.values.get("components") or [])
+        print(f"🔁 Resuming thread {thread_id} from its last checkpoint")
+        report("Resuming the article")
+    else:
+        # The header branch and the planner start together; coding starts as the plan streams in
+        report("Planning the article")
 
-    system_message = title_creator_instructions.format(topic=topic, context=context if context else "No additional context provided")
-    header = structured_llm.invoke([
-        SystemMessage(content=system_message),
-        HumanMessage(content="Generate")
-    ])
+    # "values" gives the final, plan-ordered components; "updates" reports each component as it finishes
+    try:
+        async for mode, event in graph.astream(graph_input, thread, stream_mode=["values", "updates"]):
+            if mode == "updates":
+                if "create_components" in event:
+                    planned = len(event["create_components"]["components"])
+                    report(f"Creating {planned} components")
+                elif "create_code" in event:
+                    finished += 1
+                    report(f"Finished {finished}/{planned} components")
+                continue
+            header = event.get('header') or header
+            timings = event.get('timings') or timings
+            components = event.get('coded_components', '')
+            if components:
+                list_of_comps = []
+                for component in components:
+                    print(component)
+                    print("-" * 50)
+                    list_of_comps.append(component)
+    finally:
+        # Also on errors and cancellation (e.g. the header failed while components were coding)
+        discard_prefetched(prefetched)
+
+    # The graph has finished, so its checkpoints are only kept until pruning
+    await asyncio.to_thread(checkpointer.mark_finished, thread_id)
 
     title = header.article_title
     subtitle = header.subtitle
@@ -603,21 +882,40 @@ def generate_manim_article(topic: str, max_components: int = 15, output_path: st
     print("Subtitle:", subtitle)
     print("Subject:", subject)
 
-    # Generate article components
-    thread_id = str(uuid.uuid4())
-    thread = {"configurable": {"thread_id": thread_id}}
+    generated = time.monotonic()
+    report("Assembling the article")
+    # Markdown conversion and the HTML file write stay off the event loop
+    my_html = await asyncio.to_thread(generate_page, list_of_comps, title, subtitle, subject, output_path)
+    statuses = component_status(list_of_comps)
+    failed = sum(1 for status in statuses if status["status"] == "failed")
+    if failed:
+        print(f"⚠️ Article assembled with {failed}/{len(statuses)} components failed")
+
+    # Header and plan overlap, so the header's time no longer adds to the total
+    timings = {
+        "header": round(timings.get("header", 0), 2),
+        "plan": round(timings.get("plan", 0), 2),
+        "coding_after_plan": round(generated - started - timings.get("plan", 0), 2),
+        "assemble": round(time.monotonic() - generated, 2),
+        "total": round(time.monotonic() - started, 2),
+    }
+    timings["saved_by_parallel_header"] = round(min(timings["header"], timings["plan"]), 2)
+    print(f"⏱️ Article timings (seconds): {timings}")
+    event_bus.publish(thread_id, "timings", **timings)
+    return [my_html, title, subtitle, subject, statuses]
+
+def generate_manim_article(topic: str, max_components: int = 15, output_path: str = "article.html", context: str = None, anthropic_api_key: str = None,
+                           thread_id: str = None, progress: Callable[[str], None] = None):
+    """
+    Synchronous wrapper around agenerate_manim_article for scripts (not for use inside a running event loop).
 
-    list_of_comps = []
-    for event in graph.stream({"topic": topic, "max_components": max_components, "context": context}, thread, stream_mode="values"):
-        components = event.get('coded_components', '')
-        if components:
-            for component in components:
-                print(component)
-                print("-" * 50)
-                list_of_comps.append(component)
-
-    my_html = generate_page(list_of_comps, title, subtitle, subject, output_path)
-    return [my_html, title, subtitle, subject]
+    Returns:
+        List containing [html_content, title, subtitle, subject, component_status]
+    """
+    return asyncio.run(agenerate_manim_article(
+        topic=topic, max_components=max_components, output_path=output_path, context=context,
+        anthropic_api_key=anthropic_api_key, thread_id=thread_id, progress=progress
+    ))
 
 # Example usage
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 import os
+import time
 import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 from pydantic import BaseModel, Field
@@ -8,12 +11,34 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from pdf2image import convert_from_path
 import json
 from dotenv import load_dotenv
-from .ai_generator import generate_manim_article
+from .ai_generator import agenerate_manim_article
+from .jobs.checkpoints import checkpointer
+from .llm.concurrency import ainvoke_limited
+from .llm.clients import llm_clients
+from .llm.usage import llm_usage, cached_system_message
 
 
 
 load_dotenv()
 
+# Pages rasterized at once (pdftoppm processes) and vision calls in flight per document
+PDF_RASTER_WORKERS = int(os.environ.get("PDF_RASTER_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_EXTRACT_CONCURRENCY = int(os.environ.get("PDF_EXTRACT_CONCURRENCY", "4"))
+
+_raster_pool = None
+
+def raster_pool() -> ThreadPoolExecutor:
+    """Shared pool for pdf2image conversions (each one waits on a pdftoppm subprocess)"""
+    global _raster_pool
+    if _raster_pool is None:
+        _raster_pool = ThreadPoolExecutor(max_workers=PDF_RASTER_WORKERS, thread_name_prefix="pdf-raster")
+    return _raster_pool
+
+def timed(function, *args):
+    """Call function(*args) and return (result, seconds taken)"""
+    started = time.monotonic()
+    return function(*args), time.monotonic() - started
+
 # ============================================================================
 # STRUCTURED OUTPUT MODELS
 # ============================================================================
@@ -102,13 +127,11 @@ class PDFPageExtractor:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY must be set in environment or passed as argument")
         
-        self.llm = ChatAnthropic(
-            model="claude-sonnet-4-5-20250929",
-            temperature=0.3,  # Lower temperature for more accurate extraction
-            api_key=self.api_key,
-            max_tokens=8192
-        )
-        self.structured_llm = self.llm.with_structured_output(PageContent)
+        # Lower temperature for more accurate extraction
+        self.llm = llm_clients.get(temperature=0.3, max_tokens=8192)
+        self.structured_llm = llm_clients.get(temperature=0.3, max_tokens=8192, schema=PageContent)
+        # Per-page raster/vision seconds from the last extract_pdf_range call
+        self.page_timings = []
     
     def pdf_page_to_image(self, pdf_path: str, page_num: int, dpi: int = 300) -> str:
         """
@@ -162,12 +185,27 @@ class PDFPageExtractor:
         Returns:
             PageContent object with all extracted information
         """
+        page_content = llm_usage.unwrap(self.structured_llm.invoke(self.extraction_messages(image_path, page_num)), "pdf_extract")
+        page_content.page_number = page_num
+        
+        return page_content
+    
+    async def aextract_page_content(self, image_path: str, page_num: int) -> PageContent:
+        """Async version of extract_page_content, through the LLM governor"""
+        messages = await asyncio.to_thread(self.extraction_messages, image_path, page_num)
+        page_content = await ainvoke_limited(self.structured_llm, messages, "pdf_extract")
+        page_content.page_number = page_num
+        
+        return page_content
+    
+    def extraction_messages(self, image_path: str, page_num: int):
+        """Build the vision prompt for one page image"""
         # Encode image to base64
         image_base64 = self.image_to_base64(image_path)
         
         # Create message with image
-        messages = [
-            SystemMessage(content=EXTRACTION_SYSTEM_PROMPT),
+        return [
+            cached_system_message(EXTRACTION_SYSTEM_PROMPT),
             HumanMessage(content=[
                 {
                     "type": "image",
@@ -187,12 +225,6 @@ class PDFPageExtractor:
                 }
             ])
         ]
-        
-        # Get structured response
-        page_content = self.structured_llm.invoke(messages)
-        page_content.page_number = page_num
-        
-        return page_content
     
     def extract_pdf_page(self, pdf_path: str, page_num: int, dpi: int = 300) -> PageContent:
         """
@@ -214,31 +246,91 @@ class PDFPageExtractor:
         
         return page_content
     
-    def extract_pdf_range(self, pdf_path: str, start_page: int, end_page: int, 
-                          dpi: int = 300) -> List[PageContent]:
+    async def aextract_pdf_page(self, pdf_path: str, page_num: int, dpi: int = 300) -> PageContent:
+        """Async version of extract_pdf_page; rasterizing runs in the raster pool"""
+        print(f"Converting page {page_num} to image...")
+        image_path = await asyncio.get_running_loop().run_in_executor(
+            raster_pool(), self.pdf_page_to_image, pdf_path, page_num, dpi
+        )
+        
+        print(f"Extracting content from page {page_num}...")
+        return await self.aextract_page_content(image_path, page_num)
+    
+    async def aextract_pdf_range(self, pdf_path: str, start_page: int, end_page: int,
+                                 dpi: int = 300, concurrency: int = None, progress=None) -> List[PageContent]:
         """
-        Extract content from a range of PDF pages
+        Extract content from a range of PDF pages concurrently
+        
+        Pages are rasterized in the raster pool and each one goes to the vision model as
+        soon as its image is ready, with at most `concurrency` vision calls in flight.
         
         Args:
             pdf_path: Path to the PDF file
             start_page: Starting page number (1-indexed)
             end_page: Ending page number (inclusive)
             dpi: Image resolution
+            concurrency: Vision calls in flight at once (default PDF_EXTRACT_CONCURRENCY)
+            progress: Called with a short description as each page finishes
         
         Returns:
-            List of PageContent objects
+            List of PageContent objects in page order (pages that failed are left out)
         """
-        all_pages = []
+        limit = asyncio.Semaphore(concurrency or PDF_EXTRACT_CONCURRENCY)
+        page_count = end_page - start_page + 1
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        self.page_timings = []
+        done = 0
         
-        for page_num in range(start_page, end_page + 1):
+        async def extract(page_num: int) -> Optional[PageContent]:
+            nonlocal done
+            timing = {"page": page_num}
             try:
-                page_content = self.extract_pdf_page(pdf_path, page_num, dpi)
-                all_pages.append(page_content)
+                # Every page is handed to the raster pool right away; its workers bound the conversions
+                queued = time.monotonic()
+                image_path, raster_seconds = await loop.run_in_executor(raster_pool(), timed, self.pdf_page_to_image, pdf_path, page_num, dpi)
+                timing["raster_seconds"] = round(raster_seconds, 2)
+                timing["raster_wait_seconds"] = round(time.monotonic() - queued - raster_seconds, 2)
+                
+                async with limit:
+                    vision_started = time.monotonic()
+                    page_content = await self.aextract_page_content(image_path, page_num)
+                    timing["vision_seconds"] = round(time.monotonic() - vision_started, 2)
                 print(f"✅ Successfully extracted page {page_num}")
+                return page_content
             except Exception as e:
+                timing["error"] = str(e)
                 print(f"❌ Error extracting page {page_num}: {e}")
+                return None
+            finally:
+                self.page_timings.append(timing)
+                done += 1
+                if progress:
+                    progress(f"Read {done}/{page_count} pages")
+        
+        # gather keeps page order however the pages finish
+        results = await asyncio.gather(*(extract(page_num) for page_num in range(start_page, end_page + 1)))
+        
+        self.page_timings.sort(key=lambda timing: timing["page"])
+        print(f"⏱️ Extracted {page_count} pages in {time.monotonic() - started:.1f}s: {self.page_timings}")
+        return [page for page in results if page is not None]
+    
+    def extract_pdf_range(self, pdf_path: str, start_page: int, end_page: int, 
+                          dpi: int = 300) -> List[PageContent]:
+        """
+        Extract content from a range of PDF pages
+        Synchronous wrapper around aextract_pdf_range (not for use inside a running event loop).
         
-        return all_pages
+        Args:
+            pdf_path: Path to the PDF file
+            start_page: Starting page number (1-indexed)
+            end_page: Ending page number (inclusive)
+            dpi: Image resolution
+        
+        Returns:
+            List of PageContent objects
+        """
+        return asyncio.run(self.aextract_pdf_range(pdf_path, start_page, end_page, dpi))
     
     def save_extraction(self, page_content: PageContent, output_path: str):
         """Save extracted content to JSON file"""
@@ -322,16 +414,21 @@ def create_context_from_extraction(page_content: PageContent) -> str:
 # EXAMPLE USAGE
 # ============================================================================
 
-def generate_manim_article_from_page(topic,pdf_path: str = None, page_range: tuple = None, max_components: int = 3, output_path: str ="output.html"):
+async def agenerate_manim_article_from_page(topic,pdf_path: str = None, page_range: tuple = None, max_components: int = 3, output_path: str ="output.html",
+                                            thread_id: str = None, progress=None):
 
     # Initialize extractor
     extractor = PDFPageExtractor()
     
     context = ""
+    # A resumed job already has the extracted context in its checkpoints
+    resuming = bool(thread_id) and await asyncio.to_thread(checkpointer.has_thread, thread_id)
     # Extract specified page range
-    if pdf_path and page_range:
+    if pdf_path and page_range and not resuming:
         start_page, end_page = page_range
-        extracted_pages = extractor.extract_pdf_range(pdf_path, start_page, end_page)
+        if progress:
+            progress(f"Reading {end_page - start_page + 1} pages")
+        extracted_pages = await extractor.aextract_pdf_range(pdf_path, start_page, end_page, progress=progress)
         
         # For simplicity, use only the first page's content for context
         page_contents = []
@@ -347,7 +444,17 @@ def generate_manim_article_from_page(topic,pdf_path: str = None, page_range: tup
 
     print(context)
     
-    return generate_manim_article(topic=topic, max_components=max_components, context=context, output_path=output_path)
+    return await agenerate_manim_article(topic=topic, max_components=max_components, context=context, output_path=output_path,
+                                         thread_id=thread_id, progress=progress)
+
+
+def generate_manim_article_from_page(topic,pdf_path: str = None, page_range: tuple = None, max_components: int = 3, output_path: str ="output.html",
+                                     thread_id: str = None, progress=None):
+    """Synchronous wrapper around agenerate_manim_article_from_page for scripts"""
+    return asyncio.run(agenerate_manim_article_from_page(
+        topic, pdf_path=pdf_path, page_range=page_range, max_components=max_components,
+        output_path=output_path, thread_id=thread_id, progress=progress
+    ))
 
 
 if __name__ == "__main__":
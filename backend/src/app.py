@@ -1,8 +1,42 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import generate
+from .routes import generate, jobs, media, metrics
+from .rendering.workers import worker_pool
+from .jobs.queue import job_queue
+from .llm.clients import llm_clients
 
-app = FastAPI()
+
+# The server must run as a single process (uvicorn's default, no --workers): job events live in
+# this process's memory, so an SSE client served by another process would never see them, and
+# job_queue.start() requeues every running job, which would steal jobs a sibling process is running.
+# Concurrency comes from the job workers, the Manim worker pool and the thread pool below instead.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("Notewright must run with a single server worker process (unset WEB_CONCURRENCY)")
+    # Renders, database writes and other blocking steps of running jobs share the default executor;
+    # renders can sit waiting for a scheduler slot, so give it room beyond the asyncio default
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=int(os.environ.get("BLOCKING_THREADS", "64")))
+    )
+    # Spawn the Manim workers now so their imports are done before the first render
+    worker_pool.start()
+    # Open LLM connections in the background so startup doesn't wait on the network
+    warm_llm = asyncio.create_task(llm_clients.warm())
+    job_queue.start()
+    yield
+    await job_queue.shutdown()
+    warm_llm.cancel()
+    await llm_clients.aclose()
+    worker_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,4 +47,7 @@ app.add_middleware(
 )
 
 
-app.include_router(generate.router, prefix="/api")
\ No newline at end of file
+app.include_router(generate.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
\ No newline at end of file
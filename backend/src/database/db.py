@@ -1,20 +1,74 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only, undefer
 from datetime import datetime, timedelta
+from typing import Optional
+import base64
+import json
 from . import models
 
 
-def get_articles(db: Session):
-    return db.query(models.Articles).all()
+def encode_cursor(article) -> str:
+    """Opaque keyset cursor pointing just past the given article"""
+    raw = json.dumps([article.date_created.isoformat(), article.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    date_created, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(date_created), int(article_id)
+
+def get_articles(db: Session, limit: int = 20, cursor: Optional[str] = None, subject: Optional[str] = None):
+    """
+    Return one page of article summaries, newest first
+
+    Args:
+        limit: Page size
+        cursor: next_cursor from the previous page (None for the first page)
+        subject: Only return articles with this subject
+
+    Returns:
+        Dict with the page's summaries and the cursor for the next page (None on the last page)
+    """
+    Articles = models.Articles
+    query = (
+        db.query(Articles)
+        .options(load_only(Articles.id, Articles.title, Articles.subtitle, Articles.subject, Articles.date_created))
+        .order_by(Articles.date_created.desc(), Articles.id.desc())
+    )
+    if subject:
+        query = query.filter(Articles.subject == subject)
+    if cursor:
+        query = query.filter(tuple_(Articles.date_created, Articles.id) < decode_cursor(cursor))
+
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+
+    return {
+        "articles": [
+            {
+                "id": article.id,
+                "title": article.title,
+                "subtitle": article.subtitle,
+                "subject": article.subject,
+                "date_created": article.date_created,
+            }
+            for article in page
+        ],
+        "next_cursor": encode_cursor(page[-1]) if len(rows) > limit else None,
+    }
+
+def get_article(db: Session, article_id: int):
+    return db.query(models.Articles).options(undefer(models.Articles.content)).filter(models.Articles.id == article_id).first()
 
 def get_article_quota(db: Session):
     return db.query(models.ArticleQuota).first()
 
-def add_article(db: Session, title: str, subtitle: str, subject: str, content: str):
+def add_article(db: Session, title: str, subtitle: str, subject: str, content: str, component_status: list = None):
     db_article = models.Articles(
         title=title,
         subtitle=subtitle,
         subject=subject,
-        content=content
+        content=content,
+        component_status=component_status
     )
     db.add(db_article)
     db.commit()
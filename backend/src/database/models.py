@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, create_engine
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, JSON, create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
 from datetime import datetime
 
 engine = create_engine('sqlite:///database.db', echo=True)
@@ -15,7 +15,54 @@ class Articles(Base):
     title = Column(String, nullable=False)
     subtitle = Column(String, nullable=False)
     subject = Column(String, nullable=False)
-    content = Column(String, nullable=False)
+    # Full article HTML; only loaded when explicitly requested
+    content = deferred(Column(String, nullable=False))
+    # [{"index", "kind", "status": "ok" | "failed", "error"}] for each component
+    component_status = Column(JSON, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination of the article list, optionally filtered by subject
+        Index('ix_articles_date_created_id', 'date_created', 'id'),
+        Index('ix_articles_subject_date_created_id', 'subject', 'date_created', 'id'),
+    )
+
+
+class Jobs(Base):
+    __tablename__ = 'jobs'
+
+    id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, default='queued')  # queued, running, succeeded, failed
+    prompt = Column(String, nullable=False)
+    # Combined upload kept on disk until the job finishes (None for text-only prompts)
+    pdf_path = Column(String, nullable=True)
+    page_count = Column(Integer, nullable=False, default=0)
+    progress = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    article_id = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Hash of the normalized prompt and uploads; identical requests share one running job
+    request_key = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index('ix_jobs_status_created_at', 'status', 'created_at'),
+        Index('ix_jobs_request_key_status', 'request_key', 'status'),
+    )
+
+
+class PromptCache(Base):
+    __tablename__ = 'prompt_cache'
+
+    # Same hash as Jobs.request_key
+    key = Column(String, primary_key=True)
+    prompt = Column(String, nullable=False)
+    from_upload = Column(Boolean, nullable=False, default=False)
+    article_id = Column(Integer, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.now)
 
 
 class ArticleQuota(Base):
@@ -26,6 +73,25 @@ class ArticleQuota(Base):
 
 Base.metadata.create_all(engine)
 
+
+def add_missing_columns():
+    """create_all never alters existing tables, so add columns introduced since (they must be nullable)"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                with engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"))
+                print(f"🛠️ Added column {table.name}.{column.name}")
+
+add_missing_columns()
+
+# create_all only creates indexes together with new tables, so add any missing ones to existing tables
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(engine, checkfirst=True)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
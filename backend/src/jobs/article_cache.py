@@ -0,0 +1,181 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Optional
+from sqlalchemy.orm import Session
+from ..database.models import Articles, PromptCache
+
+# ============================================================================
+# ARTICLE RESULT CACHE
+# ============================================================================
+# Classrooms send the same prompt many times within minutes. Each request gets a key
+# (the normalized prompt plus a hash of its uploads):
+# - a finished article stored under the key is served without running the pipeline
+# - a queued or running job with the key is shared (single flight, see JobQueue.submit)
+# - optionally, a text-only prompt close enough to a cached one (TF-IDF cosine over
+#   prompts and titles) reuses that article
+# Requests can bypass all three to force a fresh article.
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "to", "in", "on", "for", "is", "are", "what", "how", "why",
+    "me", "my", "i", "it", "its", "this", "that", "with", "about", "please", "can", "you",
+    "explain", "describe", "tell", "teach", "show",
+}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip(".?!").strip()
+
+
+def stem(word: str) -> str:
+    """Fold simple plurals (derivatives -> derivative)"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str):
+    return [stem(word) for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+
+
+class ArticleCache:
+    """Maps request keys to stored articles, with an optional near-duplicate index"""
+
+    def __init__(self, similarity: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            similarity: Cosine similarity a text-only prompt needs to reuse a cached article
+                (or PROMPT_CACHE_SIMILARITY env var, default 0 = exact matches only)
+        """
+        self.similarity = similarity if similarity is not None else float(os.environ.get("PROMPT_CACHE_SIMILARITY", "0"))
+        self._lock = threading.Lock()
+        # Near-duplicate index over text-only entries, built from the table on first use
+        self._documents = None  # key -> (article_id, term Counter)
+        self._document_frequency = Counter()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def key_for(prompt: str, file_hash: str = None) -> str:
+        return hashlib.sha256(f"{normalize_prompt(prompt)}\0{file_hash or ''}".encode()).hexdigest()
+
+    # ------------------------------------------------------------------------
+    # Lookup and storage
+    # ------------------------------------------------------------------------
+
+    def lookup(self, db: Session, prompt: str, file_hash: str = None) -> Optional[int]:
+        """
+        Find a stored article for this request
+
+        Args:
+            prompt: The user's prompt
+            file_hash: Hash of the uploaded files (None for text-only prompts)
+
+        Returns:
+            The cached article id, or None
+        """
+        entry = db.get(PromptCache, self.key_for(prompt, file_hash))
+        if entry is not None and db.get(Articles, entry.article_id) is not None:
+            entry.hits += 1
+            db.commit()
+            self.exact_hits += 1
+            print(f"🎯 Prompt cache hit: article {entry.article_id}")
+            return entry.article_id
+
+        # Uploads make a request unique, so only text-only prompts are matched by similarity
+        if self.similarity and not file_hash:
+            match = self._most_similar(db, prompt)
+            if match is not None:
+                key, article_id, score = match
+                entry = db.get(PromptCache, key)
+                if entry is not None and db.get(Articles, article_id) is not None:
+                    entry.hits += 1
+                    db.commit()
+                    self.similar_hits += 1
+                    print(f"🎯 Near-duplicate prompt ({score:.2f}): article {article_id}")
+                    return article_id
+        return None
+
+    def store(self, db: Session, key: str, prompt: str, article_id: int, title: str = "", from_upload: bool = False):
+        """Remember the article generated for a request key (replaces an older one)"""
+        db.merge(PromptCache(key=key, prompt=prompt, from_upload=from_upload, article_id=article_id, hits=0))
+        db.commit()
+        if not from_upload:
+            with self._lock:
+                if self._documents is not None:
+                    self._add_document(key, article_id, f"{prompt} {title}")
+
+    # ------------------------------------------------------------------------
+    # Near-duplicate index
+    # ------------------------------------------------------------------------
+
+    def _add_document(self, key: str, article_id: int, text: str):
+        previous = self._documents.pop(key, None)
+        if previous:
+            self._document_frequency.subtract(previous[1].keys())
+        terms = Counter(tokenize(text))
+        self._documents[key] = (article_id, terms)
+        self._document_frequency.update(terms.keys())
+
+    def _load(self, db: Session):
+        self._documents = {}
+        rows = (db.query(PromptCache.key, PromptCache.prompt, PromptCache.article_id, Articles.title)
+                .join(Articles, Articles.id == PromptCache.article_id)
+                .filter(PromptCache.from_upload.is_(False))
+                .all())
+        for key, prompt, article_id, title in rows:
+            self._add_document(key, article_id, f"{prompt} {title}")
+
+    def _vector(self, terms: Counter) -> dict:
+        count = len(self._documents)
+        return {
+            term: tf * (math.log((1 + count) / (1 + self._document_frequency[term])) + 1)
+            for term, tf in terms.items()
+        }
+
+    def _most_similar(self, db: Session, prompt: str):
+        with self._lock:
+            if self._documents is None:
+                self._load(db)
+            query = self._vector(Counter(tokenize(prompt)))
+            query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+            if not query_norm:
+                return None
+
+            best = None
+            for key, (article_id, terms) in self._documents.items():
+                vector = self._vector(terms)
+                norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+                if not norm:
+                    continue
+                score = sum(weight * vector.get(term, 0) for term, weight in query.items()) / (query_norm * norm)
+                if score >= self.similarity and (best is None or score > best[2]):
+                    best = (key, article_id, score)
+            return best
+
+    def stats(self) -> dict:
+        served = self.exact_hits + self.similar_hits + self.coalesced
+        lookups = served + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(served / lookups, 3) if lookups else None,
+            "similarity_threshold": self.similarity or None,
+        }
+
+
+article_cache = ArticleCache()
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.serde.base import maybe_add_typed_methods
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# ============================================================================
+# DURABLE GRAPH CHECKPOINTS
+# ============================================================================
+# MemorySaver kept every article's plans, code and retries in process memory forever.
+# Checkpoints now go to a SQLite file, so memory stays flat and a job interrupted by a
+# crash resumes from its last checkpoint: components whose writes were saved are not redone.
+# Only the latest checkpoint of recently read threads is kept in memory (an LRU), and
+# finished threads are pruned by age and count.
+
+CHECKPOINT_DB = os.environ.get("CHECKPOINT_DB", "checkpoints.db")
+
+
+class DurableCheckpointer(SqliteSaver):
+    """SqliteSaver with async methods (run in threads), a bounded read cache and pruning"""
+
+    def __init__(self, path: str = CHECKPOINT_DB, cache_size: int = None, ttl_hours: float = None, max_finished: int = None):
+        """
+        Initialize the checkpointer
+
+        Args:
+            path: SQLite file the checkpoints are written to
+            cache_size: Latest checkpoints kept in memory (or CHECKPOINT_CACHE_SIZE env var, default 64)
+            ttl_hours: How long finished threads are kept (or CHECKPOINT_TTL_HOURS, default 24)
+            max_finished: Most finished threads kept (or CHECKPOINT_MAX_FINISHED, default 200)
+        """
+        # check_same_thread=False: calls come from worker threads; SqliteSaver serializes them with its lock
+        super().__init__(sqlite3.connect(path, check_same_thread=False))
+        self.cache_size = cache_size or int(os.environ.get("CHECKPOINT_CACHE_SIZE", "64"))
+        self.ttl_hours = ttl_hours or float(os.environ.get("CHECKPOINT_TTL_HOURS", "24"))
+        self.max_finished = max_finished or int(os.environ.get("CHECKPOINT_MAX_FINISHED", "200"))
+        self._cache = OrderedDict()  # (thread_id, checkpoint_ns) -> latest CheckpointTuple
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.pruned_threads = 0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS finished_threads (
+                thread_id TEXT PRIMARY KEY,
+                finished_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def allow_types(self, *types):
+        """Only deserialize these state types (plus LangGraph's built-in safe types) from checkpoints"""
+        self.serde = maybe_add_typed_methods(JsonPlusSerializer(
+            allowed_msgpack_modules=[(t.__module__, t.__name__) for t in types]
+        ))
+
+    # ------------------------------------------------------------------------
+    # In-memory layer
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(config: RunnableConfig):
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+    def _forget(self, thread_id: str, checkpoint_ns: str = None):
+        with self.lock:
+            for key in list(self._cache):
+                if key[0] == thread_id and (checkpoint_ns is None or key[1] == checkpoint_ns):
+                    del self._cache[key]
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        # Only "latest checkpoint" reads are cached; reads of a specific checkpoint id go to disk
+        if config["configurable"].get("checkpoint_id"):
+            return super().get_tuple(config)
+        key = self._cache_key(config)
+        with self.lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        checkpoint = super().get_tuple(config)
+        if checkpoint is not None:
+            with self.lock:
+                self._cache[key] = checkpoint
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return checkpoint
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._forget(*self._cache_key(config))
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self._forget(*self._cache_key(config))
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._forget(thread_id)
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM finished_threads WHERE thread_id = ?", (str(thread_id),))
+
+    # ------------------------------------------------------------------------
+    # Async interface (the graph runs on the event loop; SQLite work goes to threads)
+    # ------------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        checkpoints = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        return await asyncio.to_thread(lambda: self.get_delta_channel_history(config=config, channels=channels))
+
+    # ------------------------------------------------------------------------
+    # Pruning
+    # ------------------------------------------------------------------------
+
+    def has_thread(self, thread_id: str) -> bool:
+        """Whether any checkpoint was saved for this thread (i.e. a run can be resumed)"""
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (str(thread_id),))
+            return cur.fetchone() is not None
+
+    def mark_finished(self, thread_id: str):
+        """Record that a thread's run is over; its checkpoints become eligible for pruning"""
+        self._forget(thread_id)
+        with self.cursor() as cur:
+            cur.execute("INSERT OR REPLACE INTO finished_threads (thread_id, finished_at) VALUES (?, ?)",
+                        (str(thread_id), time.time()))
+
+    def prune(self) -> int:
+        """
+        Delete finished threads older than the TTL, and the oldest beyond max_finished
+
+        Returns:
+            Number of threads deleted
+        """
+        cutoff = time.time() - self.ttl_hours * 3600
+        with self.cursor(transaction=False) as cur:
+            cur.execute("""
+                SELECT thread_id FROM finished_threads
+                WHERE finished_at < ?
+                   OR thread_id NOT IN (SELECT thread_id FROM finished_threads ORDER BY finished_at DESC LIMIT ?)
+            """, (cutoff, self.max_finished))
+            expired = [row[0] for row in cur.fetchall()]
+
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        if expired:
+            self.pruned_threads += len(expired)
+            print(f"🧹 Pruned checkpoints of {len(expired)} finished threads")
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints")
+            threads = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM finished_threads")
+            finished = cur.fetchone()[0]
+        return {
+            "threads": threads,
+            "finished_threads": finished,
+            "cached": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "pruned_threads": self.pruned_threads,
+        }
+
+
+checkpointer = DurableCheckpointer()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List
+
+# ============================================================================
+# JOB PROGRESS EVENTS
+# ============================================================================
+# The pipeline publishes structured events from worker threads, keyed by job id (which is also
+# the graph thread_id). Each job keeps its full event history so a client that connects late,
+# or reconnects with Last-Event-ID, replays everything it missed.
+
+# Events that end a job's stream
+TERMINAL_EVENTS = {"done", "failed"}
+
+
+class JobEventBus:
+    """Thread-safe publish, asyncio subscribe"""
+
+    def __init__(self, max_jobs: int = None):
+        """
+        Initialize the bus
+
+        Args:
+            max_jobs: Number of jobs whose history is kept (or JOB_EVENT_HISTORY, default 200)
+        """
+        self.max_jobs = max_jobs or int(os.environ.get("JOB_EVENT_HISTORY", "200"))
+        self._lock = threading.Lock()
+        self._history = OrderedDict()  # job id -> list of events
+        self._subscribers = {}  # job id -> list of (loop, queue)
+
+    def publish(self, job_id: str, event_type: str, **data):
+        """Record an event for a job and push it to every connected client (no-op without a job id)"""
+        if not job_id:
+            return
+        with self._lock:
+            events = self._history.setdefault(job_id, [])
+            self._history.move_to_end(job_id)
+            event = {"id": len(events) + 1, "type": event_type, "data": data}
+            events.append(event)
+            while len(self._history) > self.max_jobs:
+                old_id, _ = self._history.popitem(last=False)
+                self._subscribers.pop(old_id, None)
+            subscribers = list(self._subscribers.get(job_id, []))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def history(self, job_id: str, after: int = 0) -> List[dict]:
+        with self._lock:
+            return [event for event in self._history.get(job_id, []) if event["id"] > after]
+
+    def subscribe(self, job_id: str, after: int = 0):
+        """
+        Register an asyncio queue for a job's events (call from the event loop)
+
+        Returns:
+            (queue, events already published after the given id)
+        """
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), queue))
+            backlog = [event for event in self._history.get(job_id, []) if event["id"] > after]
+        return queue, backlog
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            subscribers[:] = [(loop, q) for loop, q in subscribers if q is not queue]
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event in the text/event-stream wire format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+event_bus = JobEventBus()
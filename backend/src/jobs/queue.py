@@ -0,0 +1,316 @@
+import asyncio
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from sqlalchemy.orm import Session
+from ..database.models import SessionLocal, Jobs
+from ..database.db import add_article
+from .events import event_bus
+from .checkpoints import checkpointer
+from .article_cache import article_cache
+
+# ============================================================================
+# DURABLE ARTICLE GENERATION QUEUE
+# ============================================================================
+# Jobs live in the jobs table, so queued work survives a restart: anything still marked
+# running when the server starts was interrupted and goes back in the queue, where it
+# resumes from its graph checkpoints (the job id is the graph thread id).
+# Workers are tasks on the server's event loop: LLM calls are awaited and renders run in
+# threads, so a running job never blocks other requests. Database work goes to threads too.
+
+JOB_INPUT_DIR = Path(os.environ.get("JOB_INPUT_DIR", "job_inputs"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    """Runs queued article generation jobs on background worker tasks"""
+
+    def __init__(self, workers: int = None, max_attempts: int = None):
+        """
+        Initialize the queue
+
+        Args:
+            workers: Number of jobs run at once (or JOB_WORKERS env var, default 2)
+            max_attempts: Times an interrupted job is retried before it fails (or JOB_MAX_ATTEMPTS, default 2)
+        """
+        self.workers = workers or int(os.environ.get("JOB_WORKERS", "2"))
+        self.max_attempts = max_attempts or int(os.environ.get("JOB_MAX_ATTEMPTS", "2"))
+        self._wakeup = None
+        self._loop = None
+        # submit runs in request threads: the cache lookup, in-flight check and insert must not interleave
+        self._submit_lock = threading.Lock()
+        self._tasks = []
+
+    # ------------------------------------------------------------------------
+    # Submitting and inspecting jobs
+    # ------------------------------------------------------------------------
+
+    def submit(self, db: Session, prompt: str, pdf_path: str = None, page_count: int = 0,
+               file_hash: str = None, bypass_cache: bool = False) -> Jobs:
+        """
+        Queue a generation job, unless the request can be answered by the article cache
+        or by a job already running for the same request
+
+        Args:
+            prompt: The user's prompt
+            pdf_path: Combined upload; it is moved into JOB_INPUT_DIR and deleted when the job ends
+                (left in place when no new job is queued)
+            page_count: Number of pages in the upload
+            file_hash: Hash of the uploaded files, part of the request key
+            bypass_cache: Always generate a fresh article
+
+        Returns:
+            The queued job, the job it was coalesced with, or a job already finished from the cache
+        """
+        request_key = article_cache.key_for(prompt, file_hash)
+        # Check and insert atomically: submit runs in request threads, and identical requests
+        # arriving together must not all miss the in-flight check and each start a job
+        with self._submit_lock:
+            if bypass_cache:
+                article_cache.bypassed += 1
+            else:
+                article_id = article_cache.lookup(db, prompt, file_hash)
+                if article_id is not None:
+                    return self._finished_from_cache(db, prompt, request_key, article_id)
+
+                in_flight = (db.query(Jobs)
+                             .filter(Jobs.request_key == request_key, Jobs.status.in_((QUEUED, RUNNING)))
+                             .order_by(Jobs.created_at)
+                             .first())
+                if in_flight:
+                    article_cache.coalesced += 1
+                    print(f"🔗 Coalesced request with job {in_flight.id}")
+                    return in_flight
+                article_cache.misses += 1
+
+            job_id = str(uuid.uuid4())
+            if pdf_path:
+                JOB_INPUT_DIR.mkdir(parents=True, exist_ok=True)
+                kept_path = JOB_INPUT_DIR / f"{job_id}.pdf"
+                shutil.move(pdf_path, kept_path)
+                pdf_path = str(kept_path)
+
+            job = Jobs(id=job_id, status=QUEUED, prompt=prompt, pdf_path=pdf_path, page_count=page_count, progress="Queued",
+                       request_key=request_key)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+
+        if self._wakeup:
+            # submit runs in request threads; asyncio.Event may only be set on its own loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        event_bus.publish(job_id, "queued")
+        print(f"📥 Queued job {job_id}")
+        return job
+
+    def _finished_from_cache(self, db: Session, prompt: str, request_key: str, article_id: int) -> Jobs:
+        """Record a job that was answered with a stored article"""
+        now = datetime.now()
+        job = Jobs(id=str(uuid.uuid4()), status=SUCCEEDED, prompt=prompt, progress="Done (from cache)",
+                   article_id=article_id, request_key=request_key, started_at=now, finished_at=now)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        event_bus.publish(job.id, "done", article_id=article_id)
+        return job
+
+    def queue_position(self, db: Session, job: Jobs) -> Optional[int]:
+        """Number of queued jobs ahead of this one (None once it has started)"""
+        if job.status != QUEUED:
+            return None
+        return db.query(Jobs).filter(Jobs.status == QUEUED, Jobs.created_at < job.created_at).count()
+
+    def stats(self, db: Session) -> dict:
+        counts = {status: db.query(Jobs).filter(Jobs.status == status).count() for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        return {"workers": len(self._tasks), **counts}
+
+    # ------------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Requeue interrupted jobs and start the workers (call from the running event loop)"""
+        self._recover()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+        print(f"✅ Started {self.workers} job workers")
+
+    async def shutdown(self):
+        """Stop the workers; jobs they were running are requeued on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _recover(self):
+        checkpointer.prune()
+        db = SessionLocal()
+        try:
+            interrupted = db.query(Jobs).filter(Jobs.status == RUNNING).all()
+            for job in interrupted:
+                if job.attempts >= self.max_attempts:
+                    self._fail(db, job, "The server stopped while this job was running")
+                else:
+                    job.status = QUEUED
+                    job.progress = "Queued after a restart"
+            db.commit()
+            if interrupted:
+                print(f"🔁 Recovered {len(interrupted)} interrupted jobs")
+        finally:
+            db.close()
+
+    def _claim(self, db: Session) -> Optional[Jobs]:
+        """Atomically move the oldest queued job to running"""
+        while True:
+            candidate = db.query(Jobs.id).filter(Jobs.status == QUEUED).order_by(Jobs.created_at).first()
+            if not candidate:
+                return None
+            claimed = db.query(Jobs).filter(Jobs.id == candidate.id, Jobs.status == QUEUED).update({
+                Jobs.status: RUNNING,
+                Jobs.started_at: datetime.now(),
+                Jobs.attempts: Jobs.attempts + 1,
+                Jobs.progress: "Starting",
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                return db.get(Jobs, candidate.id)
+
+    def _claim_next(self) -> Optional[Jobs]:
+        db = SessionLocal()
+        try:
+            job = self._claim(db)
+            if job:
+                db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self._claim_next)
+                if job:
+                    await self._run(job)
+                    continue
+            except Exception as e:
+                print(f"❌ Job worker error: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ------------------------------------------------------------------------
+    # Running a job
+    # ------------------------------------------------------------------------
+
+    def _store_progress(self, job_id: str, message: str):
+        db = SessionLocal()
+        try:
+            db.query(Jobs).filter(Jobs.id == job_id).update({Jobs.progress: message}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _fail(self, db: Session, job: Jobs, error: str):
+        job.status = FAILED
+        job.error = error
+        job.progress = "Failed"
+        job.finished_at = datetime.now()
+        db.commit()
+        self._remove_input(job)
+        # A failed job is not retried, so its checkpoints are only kept until pruning
+        checkpointer.mark_finished(job.id)
+        checkpointer.prune()
+        event_bus.publish(job.id, "failed", error=error)
+
+    def _remove_input(self, job: Jobs):
+        if job.pdf_path:
+            try:
+                os.unlink(job.pdf_path)
+            except FileNotFoundError:
+                pass
+
+    def _fail_by_id(self, job_id: str, error: str):
+        db = SessionLocal()
+        try:
+            self._fail(db, db.get(Jobs, job_id), error)
+        finally:
+            db.close()
+
+    def _succeed(self, job_id: str, title: str, subtitle: str, subject: str, content: str, component_status: list) -> int:
+        """Save the article, mark the job done and return the article id"""
+        db = SessionLocal()
+        try:
+            saved_article = add_article(db, title=title, subtitle=subtitle, subject=subject, content=content,
+                                        component_status=component_status)
+            job = db.get(Jobs, job_id)
+            # Articles with failed components aren't cached, so the next identical request tries again
+            if job.request_key and not any(component["status"] == "failed" for component in component_status):
+                article_cache.store(db, job.request_key, job.prompt, saved_article.id, title=title, from_upload=bool(job.pdf_path))
+            failed = sum(1 for component in component_status if component["status"] == "failed")
+            job.status = SUCCEEDED
+            job.article_id = saved_article.id
+            job.progress = f"Done ({failed} of {len(component_status)} components failed)" if failed else "Done"
+            job.finished_at = datetime.now()
+            db.commit()
+            self._remove_input(job)
+            checkpointer.prune()
+            return saved_article.id
+        finally:
+            db.close()
+
+    async def _run(self, job: Jobs):
+        # Imported here so the queue module stays importable without loading the whole pipeline
+        from ..ai_generator import agenerate_manim_article
+        from ..ai_generator_image import agenerate_manim_article_from_page
+
+        print(f"🏃 Running job {job.id}")
+        job_id = job.id
+        event_bus.publish(job_id, "started", attempt=job.attempts)
+        loop = asyncio.get_running_loop()
+
+        def progress(message: str):
+            event_bus.publish(job_id, "progress", message=message)
+            loop.run_in_executor(None, self._store_progress, job_id, message)
+
+        try:
+            if job.pdf_path:
+                my_html, title, subtitle, subject, component_status = await agenerate_manim_article_from_page(
+                    topic=job.prompt,
+                    pdf_path=job.pdf_path,
+                    page_range=(1, job.page_count),
+                    max_components=15,
+                    output_path="from_upload.html",
+                    thread_id=job_id,
+                    progress=progress,
+                )
+            else:
+                my_html, title, subtitle, subject, component_status = await agenerate_manim_article(
+                    topic=job.prompt,
+                    max_components=15,
+                    output_path="output.html",
+                    thread_id=job_id,
+                    progress=progress,
+                )
+
+            article_id = await asyncio.to_thread(self._succeed, job_id, title, subtitle, subject, my_html, component_status)
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            await asyncio.to_thread(self._fail_by_id, job_id, str(e))
+            return
+
+        event_bus.publish(job_id, "done", article_id=article_id)
+        print(f"✅ Job {job_id} finished: article {article_id}")
+
+
+job_queue = JobQueue()
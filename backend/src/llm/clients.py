@@ -0,0 +1,205 @@
+import asyncio
+import os
+import threading
+import weakref
+import anthropic
+import httpx
+from typing import Optional, Type
+from pydantic import BaseModel
+from langchain_anthropic import ChatAnthropic
+
+# ============================================================================
+# POOLED CHAT MODEL CLIENTS
+# ============================================================================
+# Nodes used to build a new ChatAnthropic (and structured-output wrapper) for every call.
+# The registry keeps one model per (model, temperature, max_tokens, schema), and all of
+# them send requests over one keep-alive HTTP connection pool, so TLS handshakes are paid
+# once per connection instead of once per call.
+
+DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
+ANTHROPIC_BASE_URL = os.environ.get("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+
+
+class PooledChatAnthropic(ChatAnthropic):
+    """ChatAnthropic whose Anthropic clients come from the shared connection pool"""
+
+    @property
+    def _client(self) -> anthropic.Client:
+        return llm_clients.sync_client(self._client_params)
+
+    @property
+    def _async_client(self) -> anthropic.AsyncClient:
+        return llm_clients.async_client(self._client_params)
+
+
+class LLMClientRegistry:
+    """Process-wide cache of chat models sharing pooled HTTP transports"""
+
+    def __init__(self, max_connections: int = None, keepalive_seconds: float = None, warm_connections: int = None):
+        """
+        Initialize the registry
+
+        Args:
+            max_connections: Connection pool size (or LLM_MAX_CONNECTIONS env var, default 32)
+            keepalive_seconds: How long idle connections are kept open (or LLM_KEEPALIVE_SECONDS, default 120)
+            warm_connections: Connections opened at startup (or LLM_WARM_CONNECTIONS, default 2)
+        """
+        self.max_connections = max_connections or int(os.environ.get("LLM_MAX_CONNECTIONS", "32"))
+        self.keepalive_seconds = keepalive_seconds or float(os.environ.get("LLM_KEEPALIVE_SECONDS", "120"))
+        self.warm_connections = warm_connections if warm_connections is not None else int(os.environ.get("LLM_WARM_CONNECTIONS", "2"))
+        self._lock = threading.Lock()
+        self._models = {}
+        # Async transports are tied to the event loop they were created on
+        self._async_http = weakref.WeakKeyDictionary()
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._sync_http = None
+        self._sync_clients = {}
+        self.model_hits = 0
+        self.model_misses = 0
+        self.requests = 0
+        self.new_connections = 0
+
+    # ------------------------------------------------------------------------
+    # Chat models
+    # ------------------------------------------------------------------------
+
+    def get(self, temperature: float, max_tokens: int, schema: Optional[Type[BaseModel]] = None, model: str = DEFAULT_MODEL):
+        """
+        Return the shared chat model for these settings
+
+        Args:
+            temperature: Sampling temperature
+            max_tokens: Output token limit
+            schema: Pydantic model for structured output (None for plain text)
+            model: Model name
+
+        Returns:
+            A PooledChatAnthropic, or its with_structured_output(schema, include_raw=True) runnable
+            (include_raw keeps the token usage; llm_usage.unwrap returns the parsed object)
+        """
+        key = (model, temperature, max_tokens, schema)
+        with self._lock:
+            runnable = self._models.get(key)
+            if runnable is not None:
+                self.model_hits += 1
+                return runnable
+            self.model_misses += 1
+
+            # Retries are left to the LLM governor, which also backs off the shared concurrency limit
+            llm = PooledChatAnthropic(model=model, temperature=temperature, max_tokens=max_tokens,
+                                      api_key=os.environ.get("ANTHROPIC_API_KEY"), max_retries=0)
+            runnable = llm.with_structured_output(schema, include_raw=True) if schema else llm
+            self._models[key] = runnable
+            return runnable
+
+    # ------------------------------------------------------------------------
+    # HTTP transports
+    # ------------------------------------------------------------------------
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_seconds,
+        )
+
+    def _count_connection(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+    def _sync_trace(self, event_name: str, info: dict):
+        self._count_connection(event_name)
+
+    async def _async_trace(self, event_name: str, info: dict):
+        self._count_connection(event_name)
+
+    def _on_sync_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions["trace"] = self._sync_trace
+
+    async def _on_async_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions["trace"] = self._async_trace
+
+    def _async_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_http.get(loop)
+        if client is None:
+            client = anthropic.DefaultAsyncHttpxClient(
+                base_url=ANTHROPIC_BASE_URL, limits=self._limits(),
+                event_hooks={"request": [self._on_async_request]},
+            )
+            self._async_http[loop] = client
+        return client
+
+    def _sync_http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_http is None:
+                self._sync_http = anthropic.DefaultHttpxClient(
+                    base_url=ANTHROPIC_BASE_URL, limits=self._limits(),
+                    event_hooks={"request": [self._on_sync_request]},
+                )
+            return self._sync_http
+
+    @staticmethod
+    def _client_key(client_params: dict):
+        return (client_params["api_key"], client_params["base_url"], client_params["max_retries"],
+                client_params.get("timeout"), tuple(sorted(client_params["default_headers"].items())))
+
+    def async_client(self, client_params: dict) -> anthropic.AsyncClient:
+        """Anthropic async client for the running event loop, on the shared pool"""
+        clients = self._async_clients.setdefault(asyncio.get_running_loop(), {})
+        key = self._client_key(client_params)
+        if key not in clients:
+            clients[key] = anthropic.AsyncClient(**client_params, http_client=self._async_http_client())
+        return clients[key]
+
+    def sync_client(self, client_params: dict) -> anthropic.Client:
+        """Anthropic client for synchronous callers, on the shared pool"""
+        key = self._client_key(client_params)
+        with self._lock:
+            client = self._sync_clients.get(key)
+        if client is None:
+            client = anthropic.Client(**client_params, http_client=self._sync_http_client())
+            with self._lock:
+                client = self._sync_clients.setdefault(key, client)
+        return client
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    async def warm(self):
+        """Open keep-alive connections ahead of the first LLM call (call from the server's event loop)"""
+        client = self._async_http_client()
+
+        async def open_connection():
+            # Any response proves the TLS connection is up; it then stays in the pool
+            await client.head("/")
+
+        results = await asyncio.gather(*(open_connection() for _ in range(self.warm_connections)), return_exceptions=True)
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            print(f"⚠️ Could not pre-warm LLM connections: {failures[0]}")
+        else:
+            print(f"✅ Pre-warmed {self.warm_connections} LLM connections")
+
+    async def aclose(self):
+        client = self._async_http.pop(asyncio.get_running_loop(), None)
+        self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "models": len(self._models),
+            "model_hits": self.model_hits,
+            "model_misses": self.model_misses,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": max(0, self.requests - self.new_connections),
+            "connection_reuse_ratio": round(1 - self.new_connections / self.requests, 3) if self.requests else None,
+        }
+
+
+llm_clients = LLMClientRegistry()
@@ -0,0 +1,269 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+from contextlib import asynccontextmanager
+import anthropic
+from .usage import llm_usage
+
+# ============================================================================
+# LLM GOVERNOR
+# ============================================================================
+# Every LLM call in the pipeline is admitted through one governor:
+# - a concurrency limit that halves on 429/529 responses and creeps back up on success (AIMD)
+# - optional requests/min and tokens/min token buckets matching the account's rate limits
+# - retries of rate-limit, overload and connection errors with exponential backoff and full jitter
+# The Anthropic SDK's own retries are turned off (see clients.py) so the governor sees every 429.
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+OVERLOAD_STATUSES = {429, 529}
+RETRYABLE_STATUSES = OVERLOAD_STATUSES | {500, 502, 503, 504}
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUSES
+
+
+def is_overload(error: Exception) -> bool:
+    return getattr(error, "status_code", None) in OVERLOAD_STATUSES
+
+
+def retry_after_seconds(error: Exception):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages) -> int:
+    """Rough input size of a prompt (about 4 characters per token, images at a flat rate)"""
+    if isinstance(messages, str):
+        return len(messages) // 4
+    total = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        blocks = content if isinstance(content, list) else [content]
+        for block in blocks:
+            if isinstance(block, dict):
+                total += 1600 if block.get("type") == "image" else len(block.get("text", "")) // 4
+            else:
+                total += len(str(block)) // 4
+    return total
+
+
+class TokenBucket:
+    """Thread-safe bucket refilled continuously at per_minute / 60 per second"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float) -> float:
+        """Take amount if available and return 0, else return the seconds to wait before trying again"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def adjust(self, amount: float):
+        """Charge (or refund) the difference between an estimate and the real usage"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LLMGovernor:
+    """Admission control, adaptive concurrency and retries for all LLM calls"""
+
+    def __init__(self, max_concurrent: int = None, requests_per_minute: float = None,
+                 tokens_per_minute: float = None, max_retries: int = None):
+        """
+        Initialize the governor
+
+        Args:
+            max_concurrent: Upper bound on in-flight LLM calls (or LLM_MAX_CONCURRENCY env var, default 16)
+            requests_per_minute: Request bucket size (or LLM_REQUESTS_PER_MINUTE, default 0 = no bucket)
+            tokens_per_minute: Token bucket size (or LLM_TOKENS_PER_MINUTE, default 0 = no bucket)
+            max_retries: Retries per call for retryable errors (or LLM_MAX_RETRIES, default 6)
+        """
+        self.max_concurrent = max_concurrent or int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+        rpm = requests_per_minute if requests_per_minute is not None else float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+        tpm = tokens_per_minute if tokens_per_minute is not None else float(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get("LLM_MAX_RETRIES", "6"))
+        self.backoff_base = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "1"))
+        self.backoff_max = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+        # Current adaptive limit; admission allows int(limit) calls at once
+        self.limit = float(self.max_concurrent)
+        self._last_decrease = 0.0
+        # asyncio primitives belong to one event loop; the server has one, but asyncio.run() callers each bring their own
+        self._conditions = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self._sites = defaultdict(lambda: {
+            "calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "overloaded": 0,
+            "wait_seconds": 0.0, "call_seconds": 0.0,
+        })
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        condition = self._conditions.get(loop)
+        if condition is None:
+            condition = asyncio.Condition()
+            self._conditions[loop] = condition
+        return condition
+
+    async def _wait_for_buckets(self, estimated_tokens: int):
+        for bucket, amount in ((self.request_bucket, 1), (self.token_bucket, estimated_tokens)):
+            if bucket is None:
+                continue
+            while True:
+                delay = bucket.take(amount)
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self, call_site: str = None, estimated_tokens: int = 0):
+        """Hold one admitted LLM call for the duration of the block"""
+        site = self._sites[call_site or "unknown"]
+        site["calls"] += 1
+        queued = time.monotonic()
+        condition = self._condition()
+
+        self.waiting += 1
+        try:
+            # Rate-limit tokens first: a call waiting on the buckets must not hold a concurrency slot
+            # other call sites could use
+            await self._wait_for_buckets(estimated_tokens)
+            async with condition:
+                await condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+                self.in_flight += 1
+        finally:
+            self.waiting -= 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        try:
+            started = time.monotonic()
+            site["wait_seconds"] += started - queued
+            try:
+                yield
+            finally:
+                site["call_seconds"] += time.monotonic() - started
+        finally:
+            self.in_flight -= 1
+            async with condition:
+                condition.notify_all()
+
+    def on_success(self, call_site: str, estimated_tokens: int = 0, usage: dict = None):
+        """Additive increase, and settle the token bucket against the real usage"""
+        self._sites[call_site or "unknown"]["succeeded"] += 1
+        self.limit = min(float(self.max_concurrent), self.limit + 1 / self.limit)
+        if self.token_bucket and usage:
+            cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+            actual = usage.get("input_tokens", 0) - cached + usage.get("output_tokens", 0)
+            self.token_bucket.adjust(actual - estimated_tokens)
+
+    def on_error(self, call_site: str, error: Exception, attempt: int, can_retry: bool = True):
+        """
+        Record a failed attempt
+
+        Args:
+            call_site: Name the call is counted under
+            error: The exception the call raised
+            attempt: Retries already made for this call
+            can_retry: False when the caller can't repeat the call (e.g. a stream already consumed)
+
+        Returns:
+            Seconds to wait before retrying, or None if the error should be raised
+        """
+        site = self._sites[call_site or "unknown"]
+        if is_overload(error):
+            site["overloaded"] += 1
+            now = time.monotonic()
+            # Multiplicative decrease, at most once a second so one burst of 429s doesn't collapse the limit
+            if now - self._last_decrease > 1:
+                self.limit = max(1.0, self.limit / 2)
+                self._last_decrease = now
+                print(f"🐢 LLM concurrency limit lowered to {int(self.limit)} after {getattr(error, 'status_code', '')}")
+
+        if not can_retry or not is_retryable(error) or attempt >= self.max_retries:
+            site["failed"] += 1
+            return None
+
+        site["retries"] += 1
+        # Full jitter: uniform over [0, base * 2^attempt], but never sooner than the server asked
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after:
+            delay = max(delay, retry_after)
+        print(f"🔁 {call_site}: {type(error).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def stats(self) -> dict:
+        sites = {}
+        for name, site in self._sites.items():
+            finished = site["succeeded"] + site["failed"] + site["retries"]
+            sites[name] = {
+                **{key: value for key, value in site.items() if not key.endswith("_seconds")},
+                "avg_wait_ms": round(1000 * site["wait_seconds"] / site["calls"]) if site["calls"] else None,
+                "avg_call_ms": round(1000 * site["call_seconds"] / finished) if finished else None,
+            }
+        return {
+            "max_concurrent": self.max_concurrent,
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "request_bucket": round(self.request_bucket.tokens, 1) if self.request_bucket else None,
+            "token_bucket": round(self.token_bucket.tokens) if self.token_bucket else None,
+            "call_sites": sites,
+        }
+
+
+llm_governor = LLMGovernor()
+
+
+def usage_of(result):
+    raw = result.get("raw") if isinstance(result, dict) else result
+    return getattr(raw, "usage_metadata", None)
+
+
+async def ainvoke_limited(runnable, messages, call_site: str = None):
+    """runnable.ainvoke(messages) through the governor (with retries), with its token usage recorded"""
+    estimated = estimate_tokens(messages)
+    attempt = 0
+    while True:
+        async with llm_governor.slot(call_site, estimated):
+            try:
+                result = await runnable.ainvoke(messages)
+                delay = None
+            except Exception as e:
+                delay = llm_governor.on_error(call_site, e, attempt)
+                if delay is None:
+                    raise
+        if delay is None:
+            llm_governor.on_success(call_site, estimated, usage_of(result))
+            return llm_usage.unwrap(result, call_site)
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from typing import AsyncIterator, List, Tuple, Type
+from pydantic import BaseModel
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.ai import add_usage
+from langchain_core.utils.json import parse_partial_json
+from .concurrency import estimate_tokens, llm_governor
+from .usage import llm_usage
+
+# ============================================================================
+# STREAMED STRUCTURED OUTPUT
+# ============================================================================
+# with_structured_output only returns once the whole tool call has been generated. When the
+# schema is a list of items, each item is usable as soon as the model moves on to the next one,
+# so this streams the tool call and yields list items as they complete.
+
+
+async def astream_list_items(llm, schema: Type[BaseModel], field: str, messages: List[BaseMessage],
+                             call_site: str = None) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Stream a forced tool call for `schema` and yield the items of its list field as they complete
+
+    Args:
+        llm: Chat model that supports tool calling
+        schema: Pydantic model the tool call must follow
+        field: Name of the list field on the schema
+        messages: Prompt messages
+        call_site: Name the call's token usage is recorded under
+
+    Yields:
+        (index, raw item dict) in list order, each exactly once
+    """
+    tool_llm = llm.bind_tools([schema], tool_choice=schema.__name__)
+    estimated = estimate_tokens(messages)
+
+    attempt = 0
+    emitted = 0
+    while True:
+        args = ""
+        usage = None
+        delay = None
+        async with llm_governor.slot(call_site, estimated):
+            try:
+                async for chunk in tool_llm.astream(messages):
+                    if getattr(chunk, "usage_metadata", None):
+                        usage = add_usage(usage, chunk.usage_metadata)
+                    for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                        args += tool_chunk.get("args") or ""
+                    if not args:
+                        continue
+
+                    partial = parse_partial_json(args)
+                    items = (partial or {}).get(field) or []
+                    # The last item may still be streaming; everything before it is final
+                    while emitted < len(items) - 1:
+                        yield emitted, items[emitted]
+                        emitted += 1
+            except Exception as e:
+                # Items already handed to the caller can't be taken back, so only a stream
+                # that failed before its first item is retried
+                delay = llm_governor.on_error(call_site, e, attempt, can_retry=not emitted)
+                if delay is None:
+                    raise
+        if delay is None:
+            break
+        attempt += 1
+        await asyncio.sleep(delay)
+
+    llm_governor.on_success(call_site, estimated, usage)
+    llm_usage.record(call_site, usage)
+    if not args:
+        raise ValueError(f"The model did not return a {schema.__name__} tool call")
+
+    items = json.loads(args).get(field) or []
+    while emitted < len(items):
+        yield emitted, items[emitted]
+        emitted += 1
@@ -0,0 +1,82 @@
+import threading
+from collections import defaultdict
+from typing import Optional
+from langchain_core.messages import SystemMessage
+
+# ============================================================================
+# PROMPT CACHING AND TOKEN ACCOUNTING
+# ============================================================================
+# The big static system prompts are marked with cache_control breakpoints, so repeated
+# plan/execute/retry calls read them from Anthropic's prompt cache. Every call's usage is
+# recorded per call site to show how much input was served from the cache.
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def cached_system_message(static_text: str, dynamic_text: str = None) -> SystemMessage:
+    """System message whose static part is a prompt-cache breakpoint (dynamic text follows it uncached)"""
+    blocks = [{"type": "text", "text": static_text, "cache_control": CACHE_CONTROL}]
+    if dynamic_text:
+        blocks.append({"type": "text", "text": dynamic_text})
+    return SystemMessage(content=blocks)
+
+
+class LLMUsage:
+    """Per-call-site input/output token counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = defaultdict(lambda: {
+            "calls": 0, "cached_input_tokens": 0, "cache_write_tokens": 0,
+            "uncached_input_tokens": 0, "output_tokens": 0,
+        })
+
+    def record(self, call_site: str, usage: Optional[dict]):
+        """Add one call's usage_metadata (LangChain's input_tokens includes cache reads and writes)"""
+        if not usage:
+            return
+        details = usage.get("input_token_details") or {}
+        cached = details.get("cache_read") or 0
+        written = details.get("cache_creation") or 0
+        uncached = max(0, usage.get("input_tokens", 0) - cached - written)
+
+        with self._lock:
+            site = self._sites[call_site or "unknown"]
+            site["calls"] += 1
+            site["cached_input_tokens"] += cached
+            site["cache_write_tokens"] += written
+            site["uncached_input_tokens"] += uncached
+            site["output_tokens"] += usage.get("output_tokens", 0)
+        print(f"💾 {call_site}: {cached} cached, {written} cache-write, {uncached} uncached input tokens")
+
+    def unwrap(self, result, call_site: str):
+        """
+        Record a call's usage and return its value
+
+        Args:
+            result: An AIMessage, or a structured-output dict from with_structured_output(include_raw=True)
+            call_site: Name the usage is counted under
+
+        Returns:
+            The message, or the parsed structured object
+        """
+        if isinstance(result, dict) and "raw" in result and "parsed" in result:
+            self.record(call_site, getattr(result["raw"], "usage_metadata", None))
+            if result.get("parsing_error"):
+                raise result["parsing_error"]
+            if result["parsed"] is None:
+                raise ValueError(f"{call_site}: the model did not return structured output")
+            return result["parsed"]
+        self.record(call_site, getattr(result, "usage_metadata", None))
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            sites = {name: dict(site) for name, site in self._sites.items()}
+        for site in sites.values():
+            total = site["cached_input_tokens"] + site["cache_write_tokens"] + site["uncached_input_tokens"]
+            site["cache_hit_ratio"] = round(site["cached_input_tokens"] / total, 3) if total else None
+        return sites
+
+
+llm_usage = LLMUsage()
@@ -0,0 +1,155 @@
+import ast
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from importlib import metadata
+from pathlib import Path
+from typing import Optional
+
+# ============================================================================
+# RENDER CACHE
+# ============================================================================
+
+def normalize_code(code: str) -> str:
+    """Normalize Manim source so formatting and comments don't change the cache key"""
+    try:
+        return ast.unparse(ast.parse(code))
+    except SyntaxError:
+        return "\n".join(line.rstrip() for line in code.strip().splitlines() if line.strip())
+
+def manim_version() -> str:
+    """Return the installed Manim version, or 'unknown' if it can't be determined"""
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class RenderCache:
+    """Persistent content-addressed cache of rendered Manim outputs with LRU eviction"""
+
+    def __init__(self, root: str = None, max_bytes: int = None):
+        """
+        Initialize the cache
+
+        Args:
+            root: Directory holding cached renders (or RENDER_CACHE_DIR env var)
+            max_bytes: Size budget before the least recently used entries are evicted
+                       (or RENDER_CACHE_MAX_MB env var, default 2048 MB)
+        """
+        self.root = Path(root or os.environ.get("RENDER_CACHE_DIR", "render_cache"))
+        self.max_bytes = max_bytes or int(os.environ.get("RENDER_CACHE_MAX_MB", "2048")) * 1024 * 1024
+        self.manim_version = manim_version()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._size = None
+
+    def key_for(self, code: str, scene_name: str, quality: str, still: bool = False) -> str:
+        """Hash the normalized code together with everything else that affects the output"""
+        payload = json.dumps({
+            "code": normalize_code(code),
+            "scene": scene_name,
+            "quality": quality,
+            "still": still,
+            "manim": self.manim_version,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2]
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached output for key, marking it as recently used"""
+        for path in self._entry_dir(key).glob(f"{key}.*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                break  # Evicted by another process between glob and touch
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, source_path) -> Path:
+        """Copy a rendered file into the cache and return its cached path"""
+        source_path = Path(source_path)
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        dest = entry_dir / f"{key}{source_path.suffix}"
+        tmp = entry_dir / f"{key}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(source_path, tmp)
+        os.replace(tmp, dest)  # Atomic, so readers never see a partial file
+
+        with self._lock:
+            self.stores += 1
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += dest.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+        return dest
+
+    def _entries(self):
+        if not self.root.exists():
+            return []
+        return [p for p in self.root.glob("*/*") if p.is_file() and p.suffix != ".tmp"]
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its budget (lock held)"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+        self._size = size
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "size_bytes": self._size if self._size is not None else self._scan_size(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+render_cache = RenderCache()
@@ -0,0 +1,154 @@
+import ast
+import os
+import signal
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# ============================================================================
+# RENDER LIMITS
+# ============================================================================
+# manim_cli.py imports this as a top-level module, so no relative imports here.
+
+BUDGET_HINT = "Simplify the scene: fewer animations, shorter run_time and wait calls, no long loops."
+
+
+class RenderBudgetExceeded(Exception):
+    """A render was stopped (or refused) for exceeding its time, CPU, memory or duration budget"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Render exceeded budget: {reason}. {BUDGET_HINT}")
+
+
+class RenderLimits:
+    """Per-render resource limits; any limit set to 0 is disabled"""
+
+    def __init__(self, timeout_seconds: float = None, cpu_seconds: int = None,
+                 memory_mb: int = None, max_video_seconds: float = None):
+        """
+        Initialize the limits
+
+        Args:
+            timeout_seconds: Wall-clock limit per render (or RENDER_TIMEOUT_SECONDS, default 180)
+            cpu_seconds: CPU time limit per render (or RENDER_CPU_SECONDS, default 300)
+            memory_mb: Address-space limit for render processes (or RENDER_MEMORY_MB, default 4096)
+            max_video_seconds: Longest estimated video we agree to render (or RENDER_MAX_VIDEO_SECONDS, default 40)
+        """
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else float(os.environ.get("RENDER_TIMEOUT_SECONDS", "180"))
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else int(os.environ.get("RENDER_CPU_SECONDS", "300"))
+        self.memory_mb = memory_mb if memory_mb is not None else int(os.environ.get("RENDER_MEMORY_MB", "4096"))
+        self.max_video_seconds = max_video_seconds if max_video_seconds is not None else float(os.environ.get("RENDER_MAX_VIDEO_SECONDS", "40"))
+
+    @property
+    def timeout(self):
+        return self.timeout_seconds or None
+
+    def apply_memory_limit(self):
+        """Cap the calling process's address space"""
+        if resource and self.memory_mb:
+            limit = self.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def apply_cpu_limit(self):
+        """Allow the calling process cpu_seconds more CPU time from now (SIGXCPU past that)"""
+        if resource and self.cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(usage.ru_utime + usage.ru_stime) + self.cpu_seconds
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+    def child_env(self) -> dict:
+        """Environment that makes RenderLimits() in a CLI render process use these limits"""
+        return {"RENDER_CPU_SECONDS": str(self.cpu_seconds), "RENDER_MEMORY_MB": str(self.memory_mb)}
+
+    def describe_exit(self, returncode: int, output: str = ""):
+        """Return the budget that killed a render process, or None if it failed for another reason"""
+        if returncode in (-signal.SIGXCPU, 128 + signal.SIGXCPU):
+            return f"used more than {self.cpu_seconds}s of CPU time"
+        if returncode in (-signal.SIGKILL, 128 + signal.SIGKILL) or "MemoryError" in (output or ""):
+            return f"ran out of its {self.memory_mb} MB memory budget"
+        return None
+
+
+# ============================================================================
+# VIDEO DURATION ESTIMATE
+# ============================================================================
+
+def _constant(node, default: float) -> float:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    return default
+
+
+def _keyword(call: ast.Call, name: str):
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _iterations(node: ast.For) -> int:
+    """Number of loop iterations when it is statically known, else 1"""
+    it = node.iter
+    if isinstance(it, (ast.List, ast.Tuple, ast.Set)):
+        return len(it.elts)
+    if isinstance(it, ast.Call) and isinstance(it.func, ast.Name) and it.func.id == "range":
+        bounds = [_constant(arg, None) for arg in it.args]
+        if bounds and None not in bounds:
+            return max(0, len(range(*(int(b) for b in bounds))))
+    return 1
+
+
+def _statement_seconds(stmt) -> float:
+    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
+        call = stmt.value
+        if isinstance(call.func, ast.Attribute) and isinstance(call.func.value, ast.Name) and call.func.value.id == "self":
+            if call.func.attr == "play":
+                return _constant(_keyword(call, "run_time"), 1.0)
+            if call.func.attr == "wait":
+                duration = call.args[0] if call.args else _keyword(call, "duration")
+                return _constant(duration, 1.0)
+        return 0.0
+    if isinstance(stmt, ast.For):
+        return _iterations(stmt) * _body_seconds(stmt.body) + _body_seconds(stmt.orelse)
+    if isinstance(stmt, ast.If):
+        return max(_body_seconds(stmt.body), _body_seconds(stmt.orelse))
+    if isinstance(stmt, (ast.While, ast.With)):
+        return _body_seconds(stmt.body)
+    if isinstance(stmt, ast.Try):
+        return _body_seconds(stmt.body) + _body_seconds(stmt.finalbody)
+    return 0.0
+
+
+def _body_seconds(body) -> float:
+    return sum(_statement_seconds(stmt) for stmt in body)
+
+
+def estimate_video_seconds(code: str, scene_name: str) -> float:
+    """Rough length of the scene's video from its play/wait calls (unknown loops count once)"""
+    tree = ast.parse(code)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "construct":
+                    return _body_seconds(item.body)
+    return 0.0
+
+
+def check_video_duration(code: str, scene_name: str, limits: "RenderLimits"):
+    """Refuse to render scenes whose estimated video is longer than allowed"""
+    if not limits.max_video_seconds:
+        return
+    seconds = estimate_video_seconds(code, scene_name)
+    if seconds > limits.max_video_seconds:
+        raise RenderBudgetExceeded(
+            f"the video would be about {seconds:.0f}s long, over the {limits.max_video_seconds:.0f}s limit"
+        )
+
+
+render_limits = RenderLimits()
@@ -0,0 +1,26 @@
+import os
+import sys
+from limits import RenderLimits
+from scheduler import lower_render_priority
+from tex_cache import install_atomic_writers
+
+# Run as a script in place of the `manim` command, so CLI renders write the shared Tex/Text
+# cache atomically just like the worker pool does. Arguments are the usual manim CLI ones.
+# The process also deprioritizes and limits itself (RENDER_NICE, RENDER_CPUS, RENDER_CPU_SECONDS,
+# RENDER_MEMORY_MB, set by render_with_cli), so the server never needs a preexec_fn.
+
+
+def prepare_process():
+    """Lower this process's priority and apply the render limits, before Manim is imported"""
+    cpus = {int(cpu) for cpu in os.environ.get("RENDER_CPUS", "").split(",") if cpu}
+    lower_render_priority(int(os.environ.get("RENDER_NICE", "0")), cpus)
+    limits = RenderLimits()
+    limits.apply_memory_limit()
+    limits.apply_cpu_limit()
+
+
+if __name__ == "__main__":
+    prepare_process()
+    install_atomic_writers()
+    from manim.__main__ import main
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import ast
+import builtins
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+# ============================================================================
+# PRE-FLIGHT STATIC VALIDATION
+# ============================================================================
+
+SCENE_BASES = {
+    "Scene", "ThreeDScene", "MovingCameraScene", "ZoomedScene", "VectorScene",
+    "LinearTransformationScene", "SpecialThreeDScene",
+}
+
+# manim re-exports numpy as np and the prompts lean on np.*, so importing it explicitly is harmless
+ALLOWED_IMPORTS = {"manim", "numpy", "math"}
+
+_manim_names = None
+
+
+class PreflightIssue(BaseModel):
+    """A single problem found in generated Manim code before rendering"""
+    kind: str = Field(description="syntax, no-scene, import or undefined-name")
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self):
+        where = f"line {self.line}: " if self.line else ""
+        return f"{where}[{self.kind}] {self.message}"
+
+
+class PreflightError(Exception):
+    """Generated code failed static validation; issues holds the structured findings"""
+
+    def __init__(self, issues: List[PreflightIssue]):
+        self.issues = issues
+        super().__init__(
+            "The code failed static validation before rendering:\n"
+            + "\n".join(f"- {issue}" for issue in issues)
+        )
+
+
+def manim_namespace() -> Optional[set]:
+    """Names provided by `from manim import *`, or None if Manim isn't importable here"""
+    global _manim_names
+    if _manim_names is None:
+        try:
+            import manim
+        except ImportError:
+            return None
+        _manim_names = set(getattr(manim, "__all__", None) or [n for n in dir(manim) if not n.startswith("_")])
+    return _manim_names
+
+
+def _base_name(base) -> str:
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        return base.attr
+    return ""
+
+
+def find_scene_classes(tree: ast.Module) -> List[str]:
+    """Scene subclasses defined in the module, following local inheritance chains"""
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    scenes = set()
+
+    changed = True
+    while changed:
+        changed = False
+        for cls in classes:
+            if cls.name in scenes:
+                continue
+            if any(_base_name(b) in SCENE_BASES or _base_name(b) in scenes for b in cls.bases):
+                scenes.add(cls.name)
+                changed = True
+
+    return [cls.name for cls in classes if cls.name in scenes]
+
+
+def pick_scene(tree: ast.Module, scenes: List[str]) -> str:
+    """Prefer the first scene that no other scene inherits from"""
+    bases = {
+        _base_name(b)
+        for node in tree.body if isinstance(node, ast.ClassDef) and node.name in scenes
+        for b in node.bases
+    }
+    leaves = [name for name in scenes if name not in bases]
+    return (leaves or scenes)[0]
+
+
+def _defined_names(tree: ast.Module) -> set:
+    """Every name the module binds anywhere (scope-insensitive, to avoid false positives)"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+    return names
+
+
+def preflight(code: str) -> str:
+    """
+    Statically validate generated Manim code without launching Manim
+
+    Args:
+        code: Cleaned Manim source
+
+    Returns:
+        Name of the scene class to render
+
+    Raises:
+        PreflightError: With every issue found
+    """
+    try:
+        tree = ast.parse(code)
+        compile(tree, "<manim scene>", "exec")
+    except SyntaxError as e:
+        raise PreflightError([PreflightIssue(kind="syntax", message=e.msg, line=e.lineno)])
+
+    issues = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        else:
+            continue
+        for module in modules:
+            if module.split(".")[0] not in ALLOWED_IMPORTS:
+                issues.append(PreflightIssue(
+                    kind="import",
+                    message=f"Import of '{module}' is not allowed; only use names from `from manim import *`",
+                    line=node.lineno,
+                ))
+
+    scenes = find_scene_classes(tree)
+    if not scenes:
+        issues.append(PreflightIssue(kind="no-scene", message="No class inheriting from a Manim Scene was found"))
+
+    manim_names = manim_namespace()
+    if manim_names is not None:
+        known = manim_names | _defined_names(tree) | set(dir(builtins))
+        reported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in known:
+                if node.id in reported:
+                    continue
+                reported.add(node.id)
+                issues.append(PreflightIssue(
+                    kind="undefined-name",
+                    message=f"'{node.id}' is not defined and is not part of the Manim namespace",
+                    line=node.lineno,
+                ))
+
+    if issues:
+        raise PreflightError(issues)
+    return pick_scene(tree, scenes)
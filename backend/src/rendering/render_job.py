@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+from .limits import render_limits, RenderBudgetExceeded
+from .scheduler import render_scheduler
+from .tex_cache import tex_cache_config, write_manim_cfg
+from .workers import QUALITY_SETTINGS
+
+# ============================================================================
+# PER-JOB RENDER DIRECTORIES
+# ============================================================================
+
+RENDER_WORK_DIR = Path(os.environ.get("RENDER_WORK_DIR", "render_jobs"))
+MANIM_CLI = Path(__file__).with_name("manim_cli.py")
+
+
+class RenderJob:
+    """One render with its own scene file and media directory, so concurrent renders never share output"""
+
+    def __init__(self, code: str, scene_name: str, quality: str, dry_run: bool = False, still: bool = False):
+        self.id = uuid.uuid4().hex[:8]
+        self.code = code
+        self.scene_name = scene_name
+        self.quality = quality
+        self.dry_run = dry_run
+        self.still = still
+
+        self.dir = RENDER_WORK_DIR / f"manim_scene_{self.id}"
+        self.media_dir = self.dir / "media"
+        self.py_path = self.dir / f"manim_scene_{self.id}.py"
+        self.cfg_path = self.dir / "manim.cfg"
+
+    def write(self):
+        """Create the job directory and save the scene source into it"""
+        self.media_dir.mkdir(parents=True, exist_ok=True)
+        self.py_path.write_text(self.code)
+        write_manim_cfg(self.cfg_path)
+        print(f"Saved to file: {self.py_path}")
+
+    def manim_config(self) -> dict:
+        """Manim config overrides for rendering this job in a worker"""
+        config = {
+            **QUALITY_SETTINGS[self.quality],
+            "media_dir": str(self.media_dir),
+            "verbosity": "WARNING",
+            **tex_cache_config(),
+        }
+        if self.dry_run:
+            config["dry_run"] = True
+        if self.still:
+            config["save_last_frame"] = True
+            config["write_to_movie"] = False
+        return config
+
+    def cli_command(self) -> list:
+        cmd = [
+            sys.executable, str(MANIM_CLI), f"-q{self.quality}", "-v", "WARNING",
+            "--media_dir", str(self.media_dir), "--config_file", str(self.cfg_path),
+        ]
+        if self.dry_run:
+            cmd.append("--dry_run")
+        if self.still:
+            cmd.append("--save_last_frame")
+        return cmd + [str(self.py_path), self.scene_name]
+
+    def find_output(self) -> Path:
+        """Locate the final video or image inside this job's media directory"""
+        videos_dir = self.media_dir / "videos"
+        if videos_dir.exists():
+            for path in videos_dir.rglob(f"{self.scene_name}.mp4"):
+                if "partial_movie_files" not in path.parts:
+                    return path
+
+        images_dir = self.media_dir / "images"
+        if images_dir.exists():
+            images = sorted(images_dir.rglob("*.png"))
+            if images:
+                return images[0]
+
+        raise RuntimeError("Manim ran successfully but produced no output files.")
+
+    def cleanup(self):
+        """Remove the job directory once its output has been copied out"""
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def render_with_cli(job: RenderJob) -> Path:
+    """Render a job with a fresh manim CLI process and return the output file (None for dry runs)"""
+    cmd = job.cli_command()
+    # No preexec_fn (unsafe in a threaded server): manim_cli.py lowers its own priority
+    # and applies the limits from these variables before importing Manim
+    env = {**os.environ, **render_scheduler.child_env(), **render_limits.child_env()}
+    print("Running:", " ".join(cmd))
+    try:
+        subprocess.run(
+            cmd, check=True, capture_output=True, text=True,
+            env=env, timeout=render_limits.timeout
+        )
+    except subprocess.TimeoutExpired:
+        # subprocess.run has already killed the process
+        raise RenderBudgetExceeded(f"ran longer than {render_limits.timeout_seconds:.0f}s")
+    except subprocess.CalledProcessError as e:
+        reason = render_limits.describe_exit(e.returncode, e.stderr)
+        if reason:
+            raise RenderBudgetExceeded(reason)
+        raise
+    if job.dry_run:
+        return None
+
+    output_path = job.find_output()
+    print("   >", output_path)
+    return output_path
@@ -0,0 +1,129 @@
+import itertools
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+# ============================================================================
+# RENDER SCHEDULER
+# ============================================================================
+# manim_cli.py imports this as a top-level module, so no relative imports here.
+
+def available_cpus() -> set:
+    """CPUs this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def lower_render_priority(nice: int, cpus: set):
+    """Deprioritize the calling process so the API process stays responsive"""
+    if nice:
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+
+
+class RenderScheduler:
+    """Process-wide limit on concurrent Manim renders, shared fairly between requests"""
+
+    def __init__(self, max_concurrent: int = None, reserved_cpus: int = None, nice: int = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_concurrent: Renders allowed at once (or RENDER_MAX_CONCURRENT env var,
+                            default one per CPU left after the reserved ones)
+            reserved_cpus: CPUs kept free of renders for the API process (or RENDER_RESERVED_CPUS, default 1)
+            nice: Niceness added to render processes (or RENDER_NICE, default 10)
+        """
+        cpus = sorted(available_cpus())
+        reserved = reserved_cpus if reserved_cpus is not None else int(os.environ.get("RENDER_RESERVED_CPUS", "1"))
+        reserved = min(reserved, len(cpus) - 1)
+
+        self.render_cpus = set(cpus[reserved:])
+        self.max_concurrent = max_concurrent or int(os.environ.get("RENDER_MAX_CONCURRENT", len(self.render_cpus)))
+        self.nice = nice if nice is not None else int(os.environ.get("RENDER_NICE", "10"))
+
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = OrderedDict()  # request_id -> deque of tickets, oldest first
+        self._running = Counter()
+
+        self.jobs_started = 0
+        self.total_wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def _queue_depth(self) -> int:
+        return sum(len(tickets) for tickets in self._waiting.values())
+
+    def _next_ticket(self):
+        """The request with the fewest running renders goes next, oldest ticket breaking ties"""
+        request_id = min(
+            self._waiting,
+            key=lambda r: (self._running[r], self._waiting[r][0])
+        )
+        return self._waiting[request_id][0]
+
+    @contextmanager
+    def slot(self, request_id: str = None):
+        """Block until a render slot is free for this request, then hold it"""
+        request_id = request_id or "default"
+        queued_at = time.monotonic()
+
+        with self._cond:
+            ticket = next(self._tickets)
+            self._waiting.setdefault(request_id, deque()).append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+
+            while sum(self._running.values()) >= self.max_concurrent or self._next_ticket() != ticket:
+                self._cond.wait()
+
+            self._waiting[request_id].popleft()
+            if not self._waiting[request_id]:
+                del self._waiting[request_id]
+            self._running[request_id] += 1
+            self.jobs_started += 1
+            self.total_wait_seconds += time.monotonic() - queued_at
+            # The head of the queue changed: waiters that re-checked before this pop must look again,
+            # or one of them can sleep through a free slot until an unrelated render finishes
+            self._cond.notify_all()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running[request_id] -= 1
+                if not self._running[request_id]:
+                    del self._running[request_id]
+                self._cond.notify_all()
+
+    def child_env(self) -> dict:
+        """Environment for CLI renders; manim_cli.py applies it with lower_render_priority"""
+        return {
+            "RENDER_NICE": str(self.nice),
+            "RENDER_CPUS": ",".join(str(cpu) for cpu in sorted(self.render_cpus)),
+        }
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": sum(self._running.values()),
+                "queue_depth": self._queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "queued_by_request": {r: len(t) for r, t in self._waiting.items()},
+                "running_by_request": dict(self._running),
+                "jobs_started": self.jobs_started,
+                "avg_wait_seconds": self.total_wait_seconds / self.jobs_started if self.jobs_started else 0.0,
+            }
+
+
+render_scheduler = RenderScheduler()
@@ -0,0 +1,99 @@
+import ast
+
+# ============================================================================
+# STILL-IMAGE GUARD
+# ============================================================================
+
+# Animations whose end state is just their mobject(s) being on screen / gone
+INTRODUCERS = {
+    "Create", "Write", "DrawBorderThenFill", "ShowCreation", "FadeIn", "GrowFromCenter",
+    "GrowFromPoint", "GrowFromEdge", "GrowArrow", "SpinInFromNothing", "SpiralIn", "AddTextLetterByLetter",
+}
+REMOVERS = {"FadeOut", "Uncreate", "Unwrite", "ShrinkToCenter", "RemoveTextLetterByLetter"}
+GROUPS = {"AnimationGroup", "LaggedStart", "Succession"}
+MULTI_MOBJECT = {"FadeIn", "FadeOut"}
+
+
+def _call_name(node) -> str:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        return node.func.id
+    return ""
+
+
+def _strip_animate(node):
+    """Turn `mob.animate.shift(UP).scale(2)` (or `mob.animate(run_time=2).shift(UP)`) into `mob.shift(UP)...`, or return None"""
+    if isinstance(node, ast.Attribute):
+        if node.attr == "animate":
+            return node.value
+        inner = _strip_animate(node.value)
+        if inner is not None:
+            return ast.Attribute(value=inner, attr=node.attr, ctx=node.ctx)
+    elif isinstance(node, ast.Call):
+        # mob.animate(run_time=2): the arguments only set the animation's timing, so drop the call
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "animate":
+            return node.func.value
+        inner = _strip_animate(node.func)
+        if inner is not None:
+            return ast.Call(func=inner, args=node.args, keywords=node.keywords)
+    return None
+
+
+def _self_call(method: str, args: list) -> ast.Expr:
+    return ast.Expr(ast.Call(
+        func=ast.Attribute(value=ast.Name("self", ast.Load()), attr=method, ctx=ast.Load()),
+        args=args,
+        keywords=[],
+    ))
+
+
+class _StaticSceneTransformer(ast.NodeTransformer):
+    """Replace self.play/self.wait statements with their instant equivalents"""
+
+    def _flatten(self, animations):
+        for anim in animations:
+            if _call_name(anim) in GROUPS:
+                yield from self._flatten(anim.args)
+            else:
+                yield anim
+
+    def visit_Expr(self, node):
+        call = node.value
+        if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                and isinstance(call.func.value, ast.Name) and call.func.value.id == "self"):
+            return node
+
+        if call.func.attr == "wait":
+            return ast.Pass()
+        if call.func.attr != "play":
+            return node
+
+        statements, remaining = [], []
+        for anim in self._flatten(call.args):
+            name = _call_name(anim)
+            mobjects = anim.args if name in MULTI_MOBJECT else anim.args[:1] if isinstance(anim, ast.Call) else []
+            stripped = _strip_animate(anim)
+
+            if name in INTRODUCERS and mobjects:
+                statements.append(_self_call("add", mobjects))
+            elif name in REMOVERS and mobjects:
+                statements.append(_self_call("remove", mobjects))
+            elif stripped is not None:
+                statements.append(ast.Expr(stripped))
+            else:
+                remaining.append(anim)
+
+        if remaining:
+            # Anything else (Transform, MoveAlongPath, ...) is left to Manim, which jumps
+            # straight to the end state when saving only the last frame
+            statements.append(ast.Expr(ast.Call(func=call.func, args=remaining, keywords=[])))
+        return statements or ast.Pass()
+
+
+def make_static(code: str) -> str:
+    """Rewrite a scene so animations become instant adds/removes; leaves unparsable code untouched"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+    tree = ast.fix_missing_locations(_StaticSceneTransformer().visit(tree))
+    return ast.unparse(tree)
@@ -0,0 +1,160 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# ============================================================================
+# SHARED TEX / TEXT SVG CACHE
+# ============================================================================
+# Manim caches Tex and Text SVGs by hash, but only inside one media directory. Every render
+# points tex_dir/text_dir at one global directory instead, and each SVG is built in a private
+# temp dir and moved into place with os.replace so concurrent renders never read a partial file.
+#
+# manim_cli.py imports this as a top-level module, so no relative imports here.
+#
+# Pre-warm at deploy time with: python -m src.rendering.tex_cache [extra_formulas.txt]
+
+TEX_CACHE_DIR = Path(os.environ.get("MANIM_TEX_CACHE_DIR", "tex_cache")).resolve()
+
+# Formulas and labels that come up in most articles
+COMMON_FORMULAS = [
+    r"f(x) = x^2",
+    r"f'(x)",
+    r"\frac{dy}{dx}",
+    r"\lim_{h \to 0}",
+    r"\lim_{h \to 0} \frac{f(x+h) - f(x)}{h}",
+    r"\frac{f(x+h) - f(x)}{h}",
+    r"\Delta x",
+    r"\Delta y",
+    r"\int_a^b f(x)\,dx",
+    r"\sum_{i=1}^{n}",
+    r"x",
+    r"y",
+    r"\theta",
+    r"\pi",
+]
+COMMON_LABELS = [
+    "x", "y", "f(x)", "Slope", "Tangent line", "Secant line", "Start", "Queue",
+    "Visited", "Distance", "Layer 0", "Layer 1", "Layer 2",
+]
+
+
+def tex_cache_config() -> dict:
+    """Manim config overrides that point a render at the shared cache"""
+    return {
+        "tex_dir": str(TEX_CACHE_DIR / "Tex"),
+        "text_dir": str(TEX_CACHE_DIR / "texts"),
+        # Cleanup would delete other renders' in-progress files if the shared dir is ever used directly
+        "no_latex_cleanup": True,
+    }
+
+
+def write_manim_cfg(path: Path):
+    """Write a manim.cfg for CLI renders (passed with --config_file)"""
+    lines = ["[CLI]"] + [f"{key} = {value}" for key, value in tex_cache_config().items()]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _private_dir() -> tempfile.TemporaryDirectory:
+    # Inside the cache dir so os.replace stays on one filesystem
+    scratch = TEX_CACHE_DIR / "tmp"
+    scratch.mkdir(parents=True, exist_ok=True)
+    return tempfile.TemporaryDirectory(dir=scratch)
+
+
+def _publish(svg_path, dest: Path) -> str:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if not dest.exists():
+        os.replace(svg_path, dest)
+    return str(dest)
+
+
+_installed = False
+
+
+def install_atomic_writers():
+    """Patch Manim (in a render process) so shared-cache SVGs are written atomically"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    from manim import config
+    import manim.mobject.text.tex_mobject as tex_mobject
+    import manim.mobject.text.text_mobject as text_mobject
+    import manim.utils.tex_file_writing as tex_file_writing
+
+    original_tex_to_svg = tex_file_writing.tex_to_svg_file
+
+    def atomic_tex_to_svg_file(expression, environment=None, tex_template=None):
+        shared_dir = Path(config.tex_dir)
+        with _private_dir() as private:
+            config.tex_dir = private
+            try:
+                tex_file = tex_file_writing.generate_tex_file(expression, environment, tex_template)
+                dest = shared_dir / tex_file.with_suffix(".svg").name
+                if dest.exists():
+                    return dest
+                svg_path = original_tex_to_svg(expression, environment, tex_template)
+            finally:
+                config.tex_dir = shared_dir
+            return Path(_publish(svg_path, dest))
+
+    tex_file_writing.tex_to_svg_file = atomic_tex_to_svg_file
+    tex_mobject.tex_to_svg_file = atomic_tex_to_svg_file
+
+    for cls in (text_mobject.Text, text_mobject.MarkupText):
+        if not (hasattr(cls, "_text2svg") and hasattr(cls, "_text2hash")):
+            print(f"⚠️ {cls.__name__} SVG writes are not atomic with this Manim version")
+            continue
+        cls._text2svg = _atomic_text2svg(cls._text2svg)
+
+
+def _atomic_text2svg(original):
+    from manim import config
+
+    def text2svg(self, color=None):
+        shared_dir = Path(config.text_dir)
+        dest = shared_dir / f"{self._text2hash(color)}.svg"
+        if dest.exists():
+            return str(dest)
+        with _private_dir() as private:
+            config.text_dir = private
+            try:
+                svg_path = original(self, color)
+            finally:
+                config.text_dir = shared_dir
+            return _publish(svg_path, dest)
+
+    return text2svg
+
+
+def prewarm(formulas=COMMON_FORMULAS, labels=COMMON_LABELS):
+    """Render common formulas and labels into the shared cache"""
+    from manim import MathTex, Text, config
+
+    for key, value in tex_cache_config().items():
+        config[key] = value
+    install_atomic_writers()
+
+    for formula in formulas:
+        try:
+            MathTex(formula)
+            print(f"✅ Cached formula: {formula}")
+        except Exception as e:
+            print(f"❌ Could not cache formula {formula}: {e}")
+
+    for label in labels:
+        try:
+            Text(label)
+            print(f"✅ Cached label: {label}")
+        except Exception as e:
+            print(f"❌ Could not cache label {label}: {e}")
+
+
+if __name__ == "__main__":
+    formulas = list(COMMON_FORMULAS)
+    if len(sys.argv) > 1:
+        # One extra formula per line
+        formulas += [line.strip() for line in Path(sys.argv[1]).read_text().splitlines() if line.strip()]
+    prewarm(formulas)
@@ -0,0 +1,278 @@
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+from pathlib import Path
+
+from .limits import render_limits, RenderBudgetExceeded
+from .scheduler import render_scheduler, lower_render_priority
+from .tex_cache import install_atomic_writers
+
+# ============================================================================
+# WARM MANIM WORKER POOL
+# ============================================================================
+
+QUALITY_SETTINGS = {
+    "l": {"pixel_width": 854, "pixel_height": 480, "frame_rate": 15},
+    "m": {"pixel_width": 1280, "pixel_height": 720, "frame_rate": 30},
+    "h": {"pixel_width": 1920, "pixel_height": 1080, "frame_rate": 60},
+}
+
+
+class RenderJobError(Exception):
+    """The scene code itself failed inside a worker; the message is the traceback"""
+
+
+class WorkerUnavailable(Exception):
+    """No usable worker could run the job; callers should fall back to the manim CLI"""
+
+
+def _render_job(job: dict) -> str:
+    """Execute a scene source in a fresh namespace and render it with the given config (None for dry runs)"""
+    from manim import config, tempconfig
+
+    # Module-level code (e.g. config.background_color = ...) must see this job's config and be undone with it
+    with tempconfig({"input_file": job["input_file"], **job["config"]}):
+        namespace = {"__name__": Path(job["input_file"]).stem}
+        exec(compile(job["source"], job["input_file"], "exec"), namespace)
+        scene_cls = namespace.get(job["scene_name"])
+        if scene_cls is None:
+            raise NameError(f"Scene class '{job['scene_name']}' is not defined in the generated code")
+
+        scene = scene_cls()
+        scene.render()
+        file_writer = scene.renderer.file_writer
+        if config.dry_run:
+            return None
+        if config.save_last_frame:
+            return str(file_writer.image_file_path)
+        return str(file_writer.movie_file_path)
+
+
+def _worker_main(conn, nice: int, cpus: set, limits):
+    """Worker process loop: import Manim once, then render jobs until told to stop"""
+    lower_render_priority(nice, cpus)
+    try:
+        import manim  # noqa: F401 -- the whole point is paying this import once
+    except Exception as e:
+        conn.send(("init_error", repr(e)))
+        return
+    limits.apply_memory_limit()
+    try:
+        install_atomic_writers()
+    except Exception as e:
+        print(f"⚠️ Shared Tex cache writes will not be atomic: {e}")
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        try:
+            limits.apply_cpu_limit()
+            conn.send(("ok", _render_job(job)))
+        except BaseException:
+            conn.send(("error", traceback.format_exc()))
+
+
+class ManimWorker:
+    """A single long-lived worker process with Manim already imported"""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, render_scheduler.nice, render_scheduler.render_cpus, render_limits),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: float):
+        """Block until the worker has finished importing Manim"""
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise WorkerUnavailable(f"Manim worker did not start within {timeout}s")
+        try:
+            status, payload = self.conn.recv()
+        except EOFError:
+            raise WorkerUnavailable("Manim worker exited during startup")
+        if status != "ready":
+            raise WorkerUnavailable(f"Manim worker failed to import Manim: {payload}")
+        self.ready = True
+
+    def run(self, job: dict, timeout: float = None) -> str:
+        """Send a job to the worker and wait for its output path"""
+        try:
+            self.conn.send(job)
+            if not self.conn.poll(timeout):
+                self.process.kill()
+                raise RenderBudgetExceeded(f"ran longer than {timeout:.0f}s")
+            status, payload = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(timeout=1)
+            reason = render_limits.describe_exit(self.process.exitcode)
+            if reason:
+                raise RenderBudgetExceeded(reason)
+            raise WorkerUnavailable(f"Manim worker {self.process.pid} crashed while rendering")
+        self.jobs += 1
+        if status == "error":
+            reason = render_limits.describe_exit(0, payload)
+            if reason:
+                raise RenderBudgetExceeded(reason)
+            raise RenderJobError(payload)
+        return payload
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it doesn't"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ManimWorkerPool:
+    """Pool of pre-imported Manim processes, recycled after a fixed number of jobs"""
+
+    def __init__(self, size: int = None, max_jobs_per_worker: int = None, startup_timeout: float = 120):
+        """
+        Initialize the pool (workers are spawned by start() or on first use)
+
+        Args:
+            size: Number of worker processes (or MANIM_WORKERS env var, default the render scheduler's
+                max_concurrent, so a render holding a scheduler slot never waits again for a worker)
+            max_jobs_per_worker: Jobs before a worker is replaced to bound leaks (or MANIM_WORKER_MAX_JOBS)
+            startup_timeout: Seconds to wait for a worker to import Manim
+        """
+        self.size = size or int(os.environ.get("MANIM_WORKERS", render_scheduler.max_concurrent))
+        self.max_jobs_per_worker = max_jobs_per_worker or int(os.environ.get("MANIM_WORKER_MAX_JOBS", "20"))
+        self.startup_timeout = startup_timeout
+        self.enabled = os.environ.get("MANIM_WORKER_POOL", "1") != "0"
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """Spawn the workers so they import Manim before the first render arrives"""
+        with self._lock:
+            if self._started or not self.enabled:
+                return
+            for _ in range(self.size):
+                self._spawn()
+            self._started = True
+        print(f"✅ Started {self.size} Manim worker processes")
+
+    def _spawn(self):
+        worker = ManimWorker(self._ctx)
+        self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker: ManimWorker):
+        """Retire a worker and put a fresh one in its place"""
+        worker.stop()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self._started:
+                self._spawn()
+
+    def render(self, source: str, input_file: str, scene_name: str, config: dict) -> str:
+        """
+        Render a scene in a warm worker
+
+        Args:
+            source: Scene source code
+            input_file: Path the source was saved to (names Manim's output folders)
+            scene_name: Scene class to render
+            config: Manim config overrides for this job
+
+        Returns:
+            Path to the rendered image or video
+        """
+        if not self.enabled:
+            raise WorkerUnavailable("Manim worker pool is disabled")
+        self.start()
+
+        worker = self._acquire()
+        try:
+            worker.wait_ready(self.startup_timeout)
+            return worker.run({
+                "source": source,
+                "input_file": input_file,
+                "scene_name": scene_name,
+                "config": config,
+            }, timeout=render_limits.timeout)
+        except RenderBudgetExceeded:
+            # The worker was killed or may be holding on to the runaway scene's memory
+            self._replace(worker)
+            worker = None
+            raise
+        except WorkerUnavailable as e:
+            if not worker.ready and "import Manim" in str(e):
+                print(f"⚠️ Disabling Manim worker pool: {e}")
+                self.enabled = False
+                worker.stop()
+                self.shutdown()
+            else:
+                self._replace(worker)
+            worker = None
+            raise
+        finally:
+            if worker is not None:
+                self._release(worker)
+
+    def _acquire(self) -> ManimWorker:
+        """Wait for an idle worker, giving up if the pool gets disabled meanwhile"""
+        while True:
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                if not self.enabled or not self._started:
+                    raise WorkerUnavailable("Manim worker pool is not running")
+
+    def _release(self, worker: ManimWorker):
+        """Return a worker to the pool, recycling it once it has done enough jobs"""
+        if not self._started or worker.jobs >= self.max_jobs_per_worker or not worker.is_alive():
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+    def shutdown(self):
+        """Stop every worker process"""
+        with self._lock:
+            self._started = False
+            workers, self._workers = self._workers, []
+            while not self._idle.empty():
+                self._idle.get_nowait()
+        for worker in workers:
+            worker.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "workers": len(self._workers),
+                "idle": self._idle.qsize(),
+                "jobs_per_worker": [w.jobs for w in self._workers],
+            }
+
+
+worker_pool = ManimWorkerPool()
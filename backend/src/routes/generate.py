@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, File, UploadFile, Form, Query
 from pydantic import BaseModel
-from ..ai_generator_image import generate_manim_article_from_page
-from ..ai_generator import generate_manim_article
+from ..jobs.queue import job_queue
+import asyncio
 import json
+import hashlib
 from datetime import datetime
 from ..database.models import get_db, Articles
-from ..database.db import add_article, get_article_quota, get_articles
+from ..database.db import add_article, get_article_quota, get_articles, get_article
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import tempfile
@@ -26,160 +27,145 @@ class ArticleRequest(BaseModel):
         json_schema_extra = {"example": {"prompt": "Explain to me what a derivative is"}}
 
 
-@router.post("/generate-article")
+def queue_job(db: Session, **kwargs) -> dict:
+    """Submit a job (see JobQueue.submit) and return the response body"""
+    job = job_queue.submit(db, **kwargs)
+    return {"job_id": job.id, "status": job.status, "article_id": job.article_id}
+
+
+def combine_uploads(uploads, temp_files: list):
+    """
+    Combine uploaded PDFs and images into one PDF (blocking; run it in a thread)
+
+    Args:
+        uploads: (filename, content_type, content) of each file, in order
+        temp_files: Temp files created here are appended for the caller to clean up
+
+    Returns:
+        (combined PDF path, total page count, hash identifying the uploads)
+    """
+    total_pages = 0
+    pdf_merger = PdfMerger()
+    # Identifies the uploads (in order) for request coalescing and the article cache
+    file_hasher = hashlib.sha256()
+    
+    for filename, content_type, content in uploads:
+        file_hasher.update(hashlib.sha256(content).digest())
+        
+        if content_type == 'application/pdf':
+            # Save PDF temporarily
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+                tmp.write(content)
+                tmp_path = tmp.name
+                temp_files.append(tmp_path)
+            
+            # Count pages and validate
+            try:
+                pdf_reader = PdfReader(tmp_path)
+                page_count = len(pdf_reader.pages)
+                total_pages += page_count
+                
+                if total_pages > 10:
+                    raise HTTPException(
+                        status_code=400, 
+                        detail=f"Total page count ({total_pages}) exceeds maximum of 10 pages"
+                    )
+                
+                # Add to merger
+                pdf_merger.append(tmp_path)
+                
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Error reading PDF {filename}: {str(e)}")
+                
+        elif content_type.startswith('image/'):
+            # Save image temporarily
+            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
+                tmp.write(content)
+                img_path = tmp.name
+                temp_files.append(img_path)
+            
+            total_pages += 1  # Each image counts as 1 page
+            
+            if total_pages > 10:
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Total page count ({total_pages}) exceeds maximum of 10 pages"
+                )
+            
+            # Convert image to PDF
+            try:
+                # Open and convert image to RGB (needed for PDF conversion)
+                img = Image.open(img_path)
+                if img.mode in ('RGBA', 'LA', 'P'):
+                    # Convert to RGB
+                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+                    if img.mode == 'P':
+                        img = img.convert('RGBA')
+                    rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+                    img = rgb_img
+                elif img.mode != 'RGB':
+                    img = img.convert('RGB')
+                
+                # Save as temporary image
+                temp_rgb_path = tempfile.NamedTemporaryFile(delete=False, suffix='.png').name
+                temp_files.append(temp_rgb_path)
+                img.save(temp_rgb_path, 'PNG')
+                
+                # Convert image to PDF
+                img_pdf_path = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf').name
+                temp_files.append(img_pdf_path)
+                
+                with open(img_pdf_path, 'wb') as f:
+                    f.write(img2pdf.convert(temp_rgb_path))
+                
+                # Add to merger
+                pdf_merger.append(img_pdf_path)
+                
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Error converting image {filename} to PDF: {str(e)}")
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {content_type}")
+    
+    # Create the combined PDF
+    combined_pdf_path = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf').name
+    temp_files.append(combined_pdf_path)
+    pdf_merger.write(combined_pdf_path)
+    pdf_merger.close()
+    
+    print(f"✅ Combined PDF created with {total_pages} pages at: {combined_pdf_path}")
+    return combined_pdf_path, total_pages, file_hasher.hexdigest()
+
+
+@router.post("/generate-article", status_code=202)
 async def generate_article(
     prompt: str = Form(...),
     files: List[UploadFile] = File(default=[]),
+    fresh: bool = Form(False),
     db: Session = Depends(get_db)
 ):
     """
     Generate an article from a text prompt and optional uploaded files (PDFs and images).
     Maximum 10 total pages (PDF pages + images count as 1 page each).
     Files are processed in order and combined into a single PDF.
+    Returns a job id right away; poll /api/jobs/{job_id} for progress and the article id.
+    Repeated prompts share a running job or return a cached article (job already succeeded)
+    unless fresh is set.
     """
     temp_files = []  # Track all temp files for cleanup
     
     try:
         # If no files provided, use regular text generation
         if not files or len(files) == 0:
-            my_html, title, subtitle, subject = generate_manim_article(
-                topic=prompt, 
-                max_components=15, 
-                output_path="output.html"
-            )
-            
-            saved_article = add_article(
-                db, 
-                title=title, 
-                subtitle=subtitle, 
-                subject=subject, 
-                content=my_html
-            )
-            
-            return {
-                "id": saved_article.id,
-                "html": my_html,
-                "title": title,
-                "subtitle": subtitle,
-                "subject": subject
-            }
+            # The cache lookup and job insert are blocking DB work, so they run in a thread
+            return await asyncio.to_thread(queue_job, db, prompt=prompt, bypass_cache=fresh)
         
-        # Process files in order
-        total_pages = 0
-        pdf_merger = PdfMerger()
+        # Read the uploads here; page counting, image conversion and merging run in a thread
+        uploads = [(file.filename, file.content_type, await file.read()) for file in files]
+        combined_pdf_path, total_pages, file_hash = await asyncio.to_thread(combine_uploads, uploads, temp_files)
         
-        for idx, file in enumerate(files):
-            content_type = file.content_type
-            
-            if content_type == 'application/pdf':
-                # Save PDF temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                    content = await file.read()
-                    tmp.write(content)
-                    tmp_path = tmp.name
-                    temp_files.append(tmp_path)
-                
-                # Count pages and validate
-                try:
-                    pdf_reader = PdfReader(tmp_path)
-                    page_count = len(pdf_reader.pages)
-                    total_pages += page_count
-                    
-                    if total_pages > 10:
-                        raise HTTPException(
-                            status_code=400, 
-                            detail=f"Total page count ({total_pages}) exceeds maximum of 10 pages"
-                        )
-                    
-                    # Add to merger
-                    pdf_merger.append(tmp_path)
-                    
-                except Exception as e:
-                    raise HTTPException(status_code=400, detail=f"Error reading PDF {file.filename}: {str(e)}")
-                    
-            elif content_type.startswith('image/'):
-                # Save image temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-                    content = await file.read()
-                    tmp.write(content)
-                    img_path = tmp.name
-                    temp_files.append(img_path)
-                
-                total_pages += 1  # Each image counts as 1 page
-                
-                if total_pages > 10:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Total page count ({total_pages}) exceeds maximum of 10 pages"
-                    )
-                
-                # Convert image to PDF
-                try:
-                    # Open and convert image to RGB (needed for PDF conversion)
-                    img = Image.open(img_path)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        # Convert to RGB
-                        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                        img = rgb_img
-                    elif img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    
-                    # Save as temporary image
-                    temp_rgb_path = tempfile.NamedTemporaryFile(delete=False, suffix='.png').name
-                    temp_files.append(temp_rgb_path)
-                    img.save(temp_rgb_path, 'PNG')
-                    
-                    # Convert image to PDF
-                    img_pdf_path = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf').name
-                    temp_files.append(img_pdf_path)
-                    
-                    with open(img_pdf_path, 'wb') as f:
-                        f.write(img2pdf.convert(temp_rgb_path))
-                    
-                    # Add to merger
-                    pdf_merger.append(img_pdf_path)
-                    
-                except Exception as e:
-                    raise HTTPException(status_code=400, detail=f"Error converting image {file.filename} to PDF: {str(e)}")
-            else:
-                raise HTTPException(status_code=400, detail=f"Unsupported file type: {content_type}")
-        
-        # Create the combined PDF
-        combined_pdf_path = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf').name
-        temp_files.append(combined_pdf_path)
-        pdf_merger.write(combined_pdf_path)
-        pdf_merger.close()
-        
-        print(f"✅ Combined PDF created with {total_pages} pages at: {combined_pdf_path}")
-        
-        # Generate article from combined PDF
-        my_html, title, subtitle, subject = generate_manim_article_from_page(
-            topic=prompt,
-            pdf_path=combined_pdf_path,
-            page_range=(1, total_pages),  # Include all pages
-            max_components=15,
-            output_path="from_upload.html"
-        )
-        
-        # Save article to database
-        saved_article = add_article(
-            db, 
-            title=title, 
-            subtitle=subtitle, 
-            subject=subject, 
-            content=my_html
-        )
-        
-        return {
-            "id": saved_article.id,
-            "html": my_html,
-            "title": title,
-            "subtitle": subtitle,
-            "subject": subject
-        }
+        # Queue generation from the combined PDF (a new job takes ownership of the file; otherwise it is deleted below)
+        return await asyncio.to_thread(queue_job, db, prompt=prompt, pdf_path=combined_pdf_path, page_count=total_pages,
+                                       file_hash=file_hash, bypass_cache=fresh)
 
     except HTTPException:
         raise
@@ -196,12 +182,20 @@ async def generate_article(
 
 
 @router.get("/articles")
-async def read_articles(db: Session = Depends(get_db)):
-
+async def read_articles(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    subject: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List article summaries (no content), newest first.
+    Pass the returned next_cursor back as cursor to get the following page.
+    """
     try:
-        articles = get_articles(db)
-        return articles
-
+        return get_articles(db, limit=limit, cursor=cursor, subject=subject)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -209,7 +203,7 @@ async def read_articles(db: Session = Depends(get_db)):
 @router.get("/articles/{article_id}")
 async def read_article(article_id: int, db: Session = Depends(get_db)):
     try:
-        article = db.query(Articles).filter(Articles.id == article_id).first()
+        article = get_article(db, article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         return article
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..database.models import get_db, Jobs
+from ..database.db import get_article
+from ..jobs.queue import job_queue, SUCCEEDED, FAILED
+from ..jobs.events import event_bus, format_sse, TERMINAL_EVENTS
+
+# Comment line sent while nothing happens so proxies keep the stream open
+HEARTBEAT_SECONDS = 15
+
+router = APIRouter()
+
+
+def get_job_or_404(db: Session, job_id: str) -> Jobs:
+    job = db.get(Jobs, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def read_job(job_id: str, db: Session = Depends(get_db)):
+    """Status and progress of an article generation job"""
+    job = get_job_or_404(db, job_id)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "queue_position": job_queue.queue_position(db, job),
+        "article_id": job.article_id,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@router.get("/jobs/{job_id}/result")
+async def read_job_result(job_id: str, db: Session = Depends(get_db)):
+    """The generated article once the job has succeeded"""
+    job = get_job_or_404(db, job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=422, detail=job.error or "Article generation failed")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    article = get_article(db, job.article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return {
+        "id": article.id,
+        "html": article.content,
+        "title": article.title,
+        "subtitle": article.subtitle,
+        "subject": article.subject
+    }
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events stream of a job's progress: header, plan, per-component
+    planning/coding/render/ready/failed events, and finally done (with the article id) or failed.
+    Reconnecting clients resume after Last-Event-ID.
+    """
+    job = get_job_or_404(db, job_id)
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    status, article_id, error = job.status, job.article_id, job.error
+    # Nothing else needs the session, so don't hold a connection for the whole stream
+    db.close()
+
+    async def events():
+        queue, backlog = event_bus.subscribe(job_id, after)
+        try:
+            for event in backlog:
+                yield format_sse(event)
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+
+            if status in (SUCCEEDED, FAILED):
+                # History is gone (e.g. after a restart); report the outcome from the database
+                if status == SUCCEEDED:
+                    yield format_sse({"id": after + 1, "type": "done", "data": {"article_id": article_id}})
+                else:
+                    yield format_sse({"id": after + 1, "type": "failed", "data": {"error": error}})
+                return
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            event_bus.unsubscribe(job_id, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
@@ -0,0 +1,48 @@
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from ..storage.blobs import blob_store, MIME_TYPES
+
+router = APIRouter()
+
+# Blob names are their content hash, so a URL's bytes can never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# When set (e.g. "/protected-media"), nginx serves the file itself via X-Accel-Redirect
+X_ACCEL_PREFIX = os.environ.get("MEDIA_X_ACCEL_PREFIX", "").rstrip("/")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+@router.api_route("/media/{blob_hash}", methods=["GET", "HEAD"])
+async def read_media(blob_hash: str, request: Request):
+    """
+    Serve a rendered image or video from the blob store.
+
+    Range requests get 206 partial responses (so video seeking only fetches what it needs),
+    the ETag is the content hash, and revalidation returns 304. The file body is sent with
+    the server's zero-copy path when available (ASGI pathsend, or nginx via X-Accel-Redirect).
+    """
+    path = blob_store.path_for(blob_hash)
+    if not path:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    etag = f'"{blob_hash}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MIME_TYPES[path.suffix]
+    if X_ACCEL_PREFIX:
+        relative = path.relative_to(blob_store.root).as_posix()
+        return Response(
+            media_type=media_type,
+            headers={**headers, "X-Accel-Redirect": f"{X_ACCEL_PREFIX}/{relative}"}
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
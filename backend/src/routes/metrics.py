@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..database.models import get_db
+from ..jobs.article_cache import article_cache
+from ..jobs.checkpoints import checkpointer
+from ..jobs.queue import job_queue
+from ..llm.concurrency import llm_governor
+from ..llm.clients import llm_clients
+from ..llm.usage import llm_usage
+from ..rendering.cache import render_cache
+from ..rendering.scheduler import render_scheduler
+from ..rendering.workers import worker_pool
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def read_metrics(db: Session = Depends(get_db)):
+    """Counters for the job queue and render pipeline"""
+    return {
+        "jobs": job_queue.stats(db),
+        "article_cache": article_cache.stats(),
+        "checkpoints": checkpointer.stats(),
+        "llm": llm_governor.stats(),
+        "llm_clients": llm_clients.stats(),
+        "llm_tokens": llm_usage.stats(),
+        "render_cache": render_cache.stats(),
+        "render_scheduler": render_scheduler.stats(),
+        "worker_pool": worker_pool.stats(),
+    }
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# ============================================================================
+# CONTENT-ADDRESSED MEDIA STORE
+# ============================================================================
+
+MEDIA_URL_PREFIX = "/api/media"
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+    ".mov": "video/mp4",
+    ".m4v": "video/mp4",
+}
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """Stores each rendered media file once on disk under its SHA-256"""
+
+    def __init__(self, root: str = None):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding the blobs (or MEDIA_STORE_DIR env var)
+        """
+        self.root = Path(root or os.environ.get("MEDIA_STORE_DIR", "media_store"))
+
+    def _blob_path(self, blob_hash: str, ext: str) -> Path:
+        return self.root / blob_hash[:2] / f"{blob_hash}{ext}"
+
+    def put_file(self, path) -> str:
+        """Store a file and return its hash (a no-op if identical content is already stored)"""
+        path = Path(path)
+        ext = path.suffix.lower()
+        if ext not in MIME_TYPES:
+            raise ValueError(f"Unsupported file type: {ext}")
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        blob_hash = sha.hexdigest()
+
+        dest = self._blob_path(blob_hash, ext)
+        if not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, dest)
+        return blob_hash
+
+    def put_bytes(self, data: bytes, ext: str) -> str:
+        """Store raw bytes with the given extension and return their hash"""
+        ext = ext.lower()
+        if ext not in MIME_TYPES:
+            raise ValueError(f"Unsupported file type: {ext}")
+
+        blob_hash = hashlib.sha256(data).hexdigest()
+        dest = self._blob_path(blob_hash, ext)
+        if not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, dest)
+        return blob_hash
+
+    def path_for(self, blob_hash: str) -> Optional[Path]:
+        """Return the stored file for a hash, or None if it isn't stored"""
+        if not HASH_PATTERN.match(blob_hash):
+            return None
+        for path in (self.root / blob_hash[:2]).glob(f"{blob_hash}.*"):
+            if path.suffix in MIME_TYPES:
+                return path
+        return None
+
+    def url_for(self, blob_hash: str) -> str:
+        return f"{MEDIA_URL_PREFIX}/{blob_hash}"
+
+    def store_media(self, path) -> str:
+        """Store a rendered file and return the URL the article HTML should use"""
+        return self.url_for(self.put_file(path))
+
+
+blob_store = BlobStore()
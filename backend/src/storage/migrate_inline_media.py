@@ -0,0 +1,67 @@
+import base64
+import re
+from sqlalchemy import text
+from ..database.models import SessionLocal, Articles, engine
+from .blobs import blob_store
+
+# ============================================================================
+# ONE-SHOT MIGRATION: INLINE DATA URIS -> BLOB STORE
+# ============================================================================
+# Articles generated before the blob store embedded every image/video as a base64 data URI.
+# This moves them into the blob store and rewrites the HTML to /api/media/<hash> URLs.
+#
+# Run from backend/ with: python -m src.storage.migrate_inline_media
+
+DATA_URI_PATTERN = re.compile(r"data:(image/[a-z0-9.+-]+|video/mp4);base64,([A-Za-z0-9+/=\s]+)")
+
+MIME_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/gif": ".gif",
+    "video/mp4": ".mp4",
+}
+
+
+def extract_data_uris(content: str):
+    """Store every supported data URI in content and return (new_content, number_replaced)"""
+    replaced = 0
+
+    def replace(match):
+        nonlocal replaced
+        ext = MIME_EXTENSIONS.get(match.group(1))
+        if not ext:
+            return match.group(0)
+        data = base64.b64decode(re.sub(r"\s", "", match.group(2)))
+        replaced += 1
+        return blob_store.url_for(blob_store.put_bytes(data, ext))
+
+    return DATA_URI_PATTERN.sub(replace, content), replaced
+
+
+def migrate_inline_media():
+    """Rewrite every article in the database, one at a time to keep memory bounded"""
+    db = SessionLocal()
+    try:
+        article_ids = [row.id for row in db.query(Articles.id).all()]
+        total = 0
+        for article_id in article_ids:
+            article = db.get(Articles, article_id)
+            new_content, replaced = extract_data_uris(article.content)
+            if replaced:
+                article.content = new_content
+                db.commit()
+                total += replaced
+                print(f"✅ Article {article_id}: moved {replaced} media files to the blob store")
+            db.expunge(article)
+        print(f"✅ Migrated {total} inline media files from {len(article_ids)} articles")
+    finally:
+        db.close()
+
+    # Give the space taken by the old base64 text back to the filesystem
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM"))
+
+
+if __name__ == "__main__":
+    migrate_inline_media()
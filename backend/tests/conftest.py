@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The database, checkpoints and job inputs use paths relative to the working directory,
+# so run the tests in a scratch directory before anything from src is imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.chdir(tempfile.mkdtemp(prefix="notewright-tests-"))
@@ -0,0 +1,24 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database.models import SessionLocal
+from src.jobs.queue import job_queue
+
+
+def test_identical_concurrent_submits_share_one_job():
+    """Requests arriving together must coalesce into a single job (single flight)"""
+    callers = 8
+    barrier = threading.Barrier(callers)
+
+    def submit(_):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            return job_queue.submit(db, prompt="Explain concurrent coalescing").id
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(callers) as pool:
+        job_ids = set(pool.map(submit, range(callers)))
+
+    assert len(job_ids) == 1
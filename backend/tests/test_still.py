@@ -0,0 +1,31 @@
+from src.rendering.still import make_static
+
+
+def scene(*lines: str) -> str:
+    body = "\n".join(f"        {line}" for line in lines)
+    return f"from manim import *\n\nclass S(Scene):\n    def construct(self):\n{body}\n"
+
+
+def test_animate_method_becomes_direct_call():
+    static = make_static(scene("c = Circle()", "self.play(c.animate.shift(UP))"))
+    assert "c.shift(UP)" in static
+    assert "animate" not in static
+
+
+def test_animate_with_arguments_drops_the_animate_call():
+    static = make_static(scene("c = Circle()", "self.play(c.animate(run_time=2).shift(UP))"))
+    assert "c.shift(UP)" in static
+    assert "c(run_time=2)" not in static
+    assert "animate" not in static
+
+
+def test_chained_animate_calls():
+    static = make_static(scene("c = Circle()", "self.play(c.animate(rate_func=smooth).shift(UP).scale(2).set_color(RED))"))
+    assert "c.shift(UP).scale(2).set_color(RED)" in static
+    assert "animate" not in static
+
+
+def test_waits_are_removed_and_introducers_become_adds():
+    static = make_static(scene("c = Circle()", "self.play(Create(c))", "self.wait(2)"))
+    assert "self.add(c)" in static
+    assert "wait" not in static
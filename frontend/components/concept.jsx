@@ -134,17 +134,21 @@ const CreateConceptPage = () => {
         formData.append('files', fileData.file);
       });
 
-      const data = await makeRequest("generate-article", {
+      const { job_id, article_id } = await makeRequest("generate-article", {
         method: "POST",
         body: formData,
         // Don't set Content-Type header - browser will set it with boundary
         headers: {}
       });
-      
-      // Navigate to the viewer page with the article ID
-      if (data.id) {
-        navigate(`/viewer?id=${data.id}`);
+
+      // A repeated prompt may be answered straight from the article cache
+      if (article_id) {
+        navigate(`/viewer?id=${article_id}`);
+        return;
       }
+
+      // Generation runs as a background job; the viewer streams it in as components finish
+      navigate(`/viewer?job=${job_id}`);
     } catch (err) {
       setError(err.message || "Failed to generate article.");
     } finally {
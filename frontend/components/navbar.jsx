@@ -15,6 +15,31 @@ const mockStats = {
   refillDays: 0
 };
 
+// Article summaries are loaded a page at a time, newest first
+const PAGE_SIZE = 20;
+
+const fetchArticlePage = async (cursor) => {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`http://localhost:8000/api/articles?${params}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch articles');
+  }
+  return response.json();
+};
+
+// Search only covers the pages loaded so far
+const filterConcepts = (concepts, query) => {
+  if (!query.trim()) return concepts;
+  const lowercaseQuery = query.toLowerCase();
+  return concepts.filter((concept) => (
+    concept.title?.toLowerCase().includes(lowercaseQuery) ||
+    concept.description?.toLowerCase().includes(lowercaseQuery) ||
+    concept.subtitle?.toLowerCase().includes(lowercaseQuery) ||
+    concept.subject?.toLowerCase().includes(lowercaseQuery)
+  ));
+};
+
 // Sidebar Navigation Component
 const Sidebar = ({ user }) => {
   const navItems = [
@@ -200,7 +225,7 @@ const ConceptRow = ({ concept, onClick }) => {
 };
 
 // Concepts List Component
-const ConceptsList = ({ concepts, onConceptClick, onSearch, onViewAll, showAll, totalCount, searchQuery }) => {
+const ConceptsList = ({ concepts, onConceptClick, onSearch, onViewAll, showAll, totalCount, searchQuery, hasMore, loadingMore, onLoadMore }) => {
   return (
     <div className="flex flex-col gap-6">
       {/* Header */}
@@ -248,18 +273,31 @@ const ConceptsList = ({ concepts, onConceptClick, onSearch, onViewAll, showAll,
             ))}
           </div>
 
-          {/* View All Button - Only show if there are more than 5 concepts */}
-          {totalCount > 5 && (
-            <div className="flex justify-center mt-6">
-              <button
-                onClick={onViewAll}
-                className="px-5 py-2.5 rounded-full bg-[#FFFFFF] border border-[#EBEBE8] hover:border-[#6E6B65] text-[#2D2A26] text-sm font-medium flex items-center gap-2 transition-all shadow-sm"
-              >
-                {showAll ? 'Show less' : `View all generated concepts (${totalCount})`}
-                <span className={`material-symbols-outlined text-[16px] transition-transform ${showAll ? 'rotate-180' : ''}`}>
-                  expand_more
-                </span>
-              </button>
+          {(totalCount > 5 || hasMore) && (
+            <div className="flex justify-center gap-3 mt-6">
+              {/* View All Button - Only show if there are more than 5 concepts */}
+              {totalCount > 5 && (
+                <button
+                  onClick={onViewAll}
+                  className="px-5 py-2.5 rounded-full bg-[#FFFFFF] border border-[#EBEBE8] hover:border-[#6E6B65] text-[#2D2A26] text-sm font-medium flex items-center gap-2 transition-all shadow-sm"
+                >
+                  {showAll ? 'Show less' : `View all generated concepts (${totalCount}${hasMore ? '+' : ''})`}
+                  <span className={`material-symbols-outlined text-[16px] transition-transform ${showAll ? 'rotate-180' : ''}`}>
+                    expand_more
+                  </span>
+                </button>
+              )}
+
+              {/* Load More Button - fetches the next page of older articles (once all loaded ones are shown) */}
+              {hasMore && (showAll || totalCount <= 5) && (
+                <button
+                  onClick={onLoadMore}
+                  disabled={loadingMore}
+                  className="px-5 py-2.5 rounded-full bg-[#FFFFFF] border border-[#EBEBE8] hover:border-[#6E6B65] text-[#2D2A26] text-sm font-medium flex items-center gap-2 transition-all shadow-sm disabled:opacity-60"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </>
@@ -277,9 +315,11 @@ const Dashboard = () => {
   const [error, setError] = useState(null);
   const [searchQuery, setSearchQuery] = useState('');
   const [showAll, setShowAll] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Calculate dynamic stats based on articles
-  const calculateStats = (articles) => {
+  const calculateStats = (articles, hasMore) => {
     if (articles.length === 0) {
       return {
         generationsUsed: 0,
@@ -289,13 +329,13 @@ const Dashboard = () => {
     }
 
     // Find the most recent article
-    const latestArticle = articles[0]; // Already reversed, so first is latest
+    const latestArticle = articles[0]; // Newest first, so first is latest
     const latestDate = new Date(latestArticle.date_created || latestArticle.createdAt);
     const now = new Date();
     const diffDays = Math.floor((now - latestDate) / (1000 * 60 * 60 * 24));
 
     return {
-      generationsUsed: articles.length,
+      generationsUsed: hasMore ? `${articles.length}+` : articles.length,
       generationsTotal: 50,
       refillDays: diffDays
     };
@@ -303,22 +343,18 @@ const Dashboard = () => {
 
   const [dynamicStats, setDynamicStats] = useState(mockStats);
 
-  // Fetch articles from backend on mount
+  // Fetch the first page of articles on mount; older pages load on demand
   useEffect(() => {
     const fetchArticles = async () => {
       try {
         setLoading(true);
-        const response = await fetch('http://localhost:8000/api/articles');
-        if (!response.ok) {
-          throw new Error('Failed to fetch articles');
-        }
-        const data = await response.json();
-        // Reverse the array to show latest articles first
-        const reversedData = data.reverse();
-        setConcepts(reversedData);
-        setFilteredConcepts(reversedData);
+        const page = await fetchArticlePage(null);
+        const data = page.articles;
+        setConcepts(data);
+        setFilteredConcepts(data);
+        setNextCursor(page.next_cursor);
         // Update stats with actual data
-        setDynamicStats(calculateStats(reversedData));
+        setDynamicStats(calculateStats(data, Boolean(page.next_cursor)));
       } catch (err) {
         setError(err.message);
         console.error('Error fetching articles:', err);
@@ -348,25 +384,27 @@ const Dashboard = () => {
 
   const handleSearch = (query) => {
     setSearchQuery(query);
-    
-    if (!query.trim()) {
-      setFilteredConcepts(concepts);
-      return;
-    }
-
-    const lowercaseQuery = query.toLowerCase();
-    const filtered = concepts.filter((concept) => {
-      return (
-        concept.title?.toLowerCase().includes(lowercaseQuery) ||
-        concept.description?.toLowerCase().includes(lowercaseQuery) ||
-        concept.subtitle?.toLowerCase().includes(lowercaseQuery) ||
-        concept.subject?.toLowerCase().includes(lowercaseQuery)
-      );
-    });
-
-    setFilteredConcepts(filtered);
+    setFilteredConcepts(filterConcepts(concepts, query));
     // Reset showAll when searching
-    setShowAll(false);
+    if (query.trim()) setShowAll(false);
+  };
+
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchArticlePage(nextCursor);
+      const data = [...concepts, ...page.articles];
+      setConcepts(data);
+      setFilteredConcepts(filterConcepts(data, searchQuery));
+      setNextCursor(page.next_cursor);
+      setDynamicStats(calculateStats(data, Boolean(page.next_cursor)));
+    } catch (err) {
+      setError(err.message);
+      console.error('Error fetching articles:', err);
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
   const handleViewAll = () => {
@@ -449,6 +487,9 @@ const Dashboard = () => {
                 showAll={showAll}
                 totalCount={filteredConcepts.length}
                 searchQuery={searchQuery}
+                hasMore={Boolean(nextCursor)}
+                loadingMore={loadingMore}
+                onLoadMore={handleLoadMore}
               />
             )}
           </div>
@@ -1329,8 +1329,58 @@ const ArticleViewerWrapper = () => {
   const [error, setError] = useState(null);
 
   const articleId = searchParams.get('id');
+  const jobId = searchParams.get('job');
 
+  // While a job is running, build the page from its event stream as components finish
   useEffect(() => {
+    if (!jobId) return;
+
+    let header = '';
+    const parts = {};
+    const assemble = () => {
+      const body = Object.keys(parts)
+        .sort((a, b) => a - b)
+        .map((index) => parts[index])
+        .join('\n');
+      setArticle({ content: header + body });
+    };
+
+    const source = new EventSource(`http://localhost:8000/api/jobs/${jobId}/events`);
+    source.addEventListener('header', (e) => {
+      header = JSON.parse(e.data).html || '';
+      assemble();
+      setLoading(false);
+    });
+    source.addEventListener('component_ready', (e) => {
+      const { index, html } = JSON.parse(e.data);
+      parts[index] = html;
+      assemble();
+    });
+    // A visual that could not be generated arrives as a caption-only placeholder
+    source.addEventListener('component_failed', (e) => {
+      const { index, html } = JSON.parse(e.data);
+      if (html) {
+        parts[index] = html;
+        assemble();
+      }
+    });
+    source.addEventListener('done', (e) => {
+      source.close();
+      // Swap to the saved article so reloads and shared links work
+      navigate(`/viewer?id=${JSON.parse(e.data).article_id}`, { replace: true });
+    });
+    source.addEventListener('failed', (e) => {
+      source.close();
+      setError(JSON.parse(e.data).error || 'Failed to generate article');
+      setLoading(false);
+    });
+
+    return () => source.close();
+  }, [jobId]);
+
+  useEffect(() => {
+    if (jobId) return;
+
     const fetchArticle = async () => {
       if (!articleId) {
         setError('No article ID provided');
@@ -1355,7 +1405,7 @@ const ArticleViewerWrapper = () => {
     };
 
     fetchArticle();
-  }, [articleId]);
+  }, [articleId, jobId]);
 
   const handleBack = () => {
     navigate('/home');
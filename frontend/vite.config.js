@@ -5,4 +5,10 @@ import tailwindcss from '@tailwindcss/vite'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react(), tailwindcss()],
+  server: {
+    // Article HTML references rendered media as /api/media/<hash>
+    proxy: {
+      '/api': 'http://localhost:8000',
+    },
+  },
 })